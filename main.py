@@ -80,6 +80,9 @@ def main() -> None:
     elif command == "model":
         train_eval_model.main_cli(config)
 
+    elif command == "model-worker":
+        train_eval_model.run_worker(config)
+
     elif command == "backtest":
         run_backtest.main(config, mode=cfg.get("mode", "realistic"))
 
@@ -4,6 +4,7 @@ from setuptools import setup, find_packages
 # A list of dependencies for the project
 install_deps = [
     "pandas",
+    "pyarrow",
     "polars",
     "xgboost",
     "optuna",
@@ -19,6 +20,7 @@ install_deps = [
     "rapidfuzz",
     "python-Levenshtein",
     "scikit-learn",
+    "numba",
     "unidecode",
     "hydra-core",
     "omegaconf",
@@ -13,7 +13,11 @@ from src.tennis_betting_model.utils.logger import (
 )
 from src.tennis_betting_model.utils.config_schema import Config
 from src.tennis_betting_model.utils.betting_math import add_ev_and_kelly, calculate_pnl
-from src.tennis_betting_model.utils.constants import BACKTEST_MAX_ODDS, BOOKMAKER_MARGIN
+from src.tennis_betting_model.utils.constants import (
+    BACKTEST_MAX_ODDS,
+    BOOKMAKER_MARGIN,
+    CATEGORICAL_FEATURES,
+)
 
 
 def _run_simulation_backtest(df: pd.DataFrame) -> pd.DataFrame:
@@ -137,19 +141,16 @@ def main(config: Config, mode: str):
         columns={"market_id": "match_id"},
         inplace=True,
     )
-    features_df.rename(
-        columns=lambda c: c.replace("[", "").replace("]", "").replace("<", ""),
-        inplace=True,
-    )
-    features_df_dummies = pd.get_dummies(
-        features_df, columns=["p1_hand", "p2_hand"], drop_first=True
-    )
-    missing_cols = set(model.feature_names_in_) - set(features_df_dummies.columns)
+    features_df.columns = features_df.columns.str.replace(r"[\[\]<]", "", regex=True)
+    for col in CATEGORICAL_FEATURES:
+        features_df[col] = features_df[col].astype("category")
+    missing_cols = set(model.feature_names_in_) - set(features_df.columns)
     for c in missing_cols:
-        features_df_dummies[c] = 0
-    features_df[model.feature_names_in_] = features_df_dummies[
-        model.feature_names_in_
-    ].fillna(0)
+        features_df[c] = 0
+    numeric_features = [
+        c for c in model.feature_names_in_ if c not in CATEGORICAL_FEATURES
+    ]
+    features_df[numeric_features] = features_df[numeric_features].fillna(0)
 
     market_data_df = None
     if mode == "realistic":
@@ -196,3 +197,8 @@ def main(config: Config, mode: str):
     output_path.parent.mkdir(parents=True, exist_ok=True)
     final_value_bets.to_csv(output_path, index=False)
     log_success(f"Saved final backtest results to {output_path}")
+
+    # Typed columnar copy for fast reloads (e.g., by the dashboard)
+    parquet_path = output_path.with_suffix(".parquet")
+    final_value_bets.astype({"market_id": str}).to_parquet(parquet_path, index=False)
+    log_success(f"Saved Parquet copy of backtest results to {parquet_path}")
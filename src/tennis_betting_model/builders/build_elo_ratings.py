@@ -7,7 +7,7 @@ from typing import Any, cast
 from collections import defaultdict
 
 from tennis_betting_model.utils.config_schema import EloConfig, DataPaths
-from tennis_betting_model.utils.common import get_surface
+from tennis_betting_model.utils.common import get_surface, sort_by_date
 from tennis_betting_model.utils.logger import log_warning, log_info
 from tennis_betting_model.utils.constants import DEFAULT_ELO_RATING
 
@@ -55,7 +55,7 @@ def _calculate_elo_ratings(
     elo_results: list[dict[str, Any]] = []
 
     match_data["tourney_date"] = pd.to_datetime(match_data["tourney_date"])
-    match_data = match_data.sort_values(by="tourney_date").reset_index(drop=True)
+    match_data = sort_by_date(match_data)
 
     match_data["winner_historical_id"] = pd.to_numeric(
         match_data["winner_historical_id"], errors="coerce"
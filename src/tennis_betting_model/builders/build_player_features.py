@@ -16,7 +16,11 @@ from src.tennis_betting_model.builders.feature_logic import get_h2h_stats_optimi
 from src.tennis_betting_model.builders.vectorized_features import (
     build_vectorized_features,
 )
-from src.tennis_betting_model.utils.common import get_most_recent_ranking
+from src.tennis_betting_model.utils.common import (
+    build_ranking_lookup,
+    get_most_recent_ranking,
+    to_feature_library_dtypes,
+)
 
 
 def main(config: Config):
@@ -95,11 +99,12 @@ def main(config: Config):
     log_info("Adding final features (ranks, odds, etc.)...")
 
     # Correctly look up the most recent rank for each player at match time
+    ranking_lookup = build_ranking_lookup(df_rankings)
     tqdm.pandas(desc="Looking up Player 1 Ranks")
-    df_features["p1_rank"] = df_features.progress_apply(lambda row: get_most_recent_ranking(df_rankings, row["p1_id"], row["tourney_date"], config.elo_config.default_player_rank), axis=1)  # type: ignore
+    df_features["p1_rank"] = df_features.progress_apply(lambda row: get_most_recent_ranking(ranking_lookup, row["p1_id"], row["tourney_date"], config.elo_config.default_player_rank), axis=1)  # type: ignore
 
     tqdm.pandas(desc="Looking up Player 2 Ranks")
-    df_features["p2_rank"] = df_features.progress_apply(lambda row: get_most_recent_ranking(df_rankings, row["p2_id"], row["tourney_date"], config.elo_config.default_player_rank), axis=1)  # type: ignore
+    df_features["p2_rank"] = df_features.progress_apply(lambda row: get_most_recent_ranking(ranking_lookup, row["p2_id"], row["tourney_date"], config.elo_config.default_player_rank), axis=1)  # type: ignore
     df_features["rank_diff"] = df_features["p1_rank"] - df_features["p2_rank"]
 
     # Merge odds info from backtest data
@@ -173,3 +178,12 @@ def main(config: Config):
     log_info(f"Saving FINAL features to {output_path}...")
     validated_features.to_csv(output_path, index=False)
     log_success(f"✅ Successfully created FINAL feature library at {output_path}")
+
+    # Typed columnar copy for fast reloads (e.g., by model training), with the
+    # same dtypes as the copy load_feature_data caches from the CSV. Floats are
+    # stored single-precision, which is what the model trains on anyway.
+    parquet_path = output_path.with_suffix(".parquet")
+    to_feature_library_dtypes(validated_features).to_parquet(
+        parquet_path, index=False, compression="zstd"
+    )
+    log_success(f"Saved Parquet copy of the feature library to {parquet_path}")
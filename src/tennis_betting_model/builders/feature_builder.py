@@ -1,6 +1,9 @@
 # FILE: src/tennis_betting_model/builders/feature_builder.py
 import pandas as pd
-from tennis_betting_model.utils.common import get_most_recent_ranking
+from tennis_betting_model.utils.common import (
+    build_ranking_lookup,
+    get_most_recent_ranking,
+)
 from tennis_betting_model.utils.config_schema import EloConfig
 
 from tennis_betting_model.builders.feature_logic import (
@@ -29,6 +32,7 @@ class FeatureBuilder:
     ):
         self.player_info_lookup = player_info_lookup
         self.df_rankings = df_rankings
+        self.ranking_lookup = build_ranking_lookup(df_rankings)
         self.df_matches = df_matches.copy()
         self.df_matches["tourney_date"] = pd.to_datetime(
             self.df_matches["tourney_date"], utc=True
@@ -43,8 +47,8 @@ class FeatureBuilder:
         Pre-processes the historical match DataFrame to create indexed lookup tables,
         dramatically speeding up live feature generation.
         """
-        winners = self.df_matches.copy()
-        winners = winners.rename(
+        # rename returns a new frame, so the match history isn't copied twice
+        winners = self.df_matches.rename(
             columns={
                 "winner_historical_id": "player_id",
                 "loser_historical_id": "opponent_id",
@@ -52,8 +56,7 @@ class FeatureBuilder:
         )
         winners["won"] = 1
 
-        losers = self.df_matches.copy()
-        losers = losers.rename(
+        losers = self.df_matches.rename(
             columns={
                 "loser_historical_id": "player_id",
                 "winner_historical_id": "opponent_id",
@@ -92,10 +95,10 @@ class FeatureBuilder:
         p2_info = self.player_info_lookup.get(p2_id, {})
 
         p1_rank = get_most_recent_ranking(
-            self.df_rankings, p1_id, match_date, self.elo_config.default_player_rank
+            self.ranking_lookup, p1_id, match_date, self.elo_config.default_player_rank
         )
         p2_rank = get_most_recent_ranking(
-            self.df_rankings, p2_id, match_date, self.elo_config.default_player_rank
+            self.ranking_lookup, p2_id, match_date, self.elo_config.default_player_rank
         )
 
         try:
@@ -181,6 +184,7 @@ class FeatureBuilder:
             "book_margin": book_margin,
             "p1_hand": p1_info.get("hand", "U"),
             "p2_hand": p2_info.get("hand", "U"),
+            "surface": surface,
             "p1_rolling_win_perc_20": p1_rolling_win_perc_20,
             "p2_rolling_win_perc_20": p2_rolling_win_perc_20,
             "p1_rolling_win_perc_50": p1_rolling_win_perc_50,
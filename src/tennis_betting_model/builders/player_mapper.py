@@ -1,8 +1,9 @@
 # src/tennis_betting_model/builders/player_mapper.py
 
+import glob
 import pandas as pd
 from pathlib import Path
-from rapidfuzz import process  # Changed import
+from rapidfuzz import fuzz, process
 from tqdm import tqdm
 import unidecode
 from collections import defaultdict  # Added import
@@ -16,6 +17,7 @@ from tennis_betting_model.utils.logger import (
 from tennis_betting_model.utils.schema import validate_data
 from tennis_betting_model.utils.data_loader import DataLoader
 from tennis_betting_model.utils.config_schema import MappingParams, DataPaths
+from tennis_betting_model.utils.file_utils import get_files_signature
 
 
 def get_initial_lastname(name):
@@ -54,29 +56,52 @@ class PlayerMapper:
         self._match_fuzzy(tour)
         return pd.DataFrame(self.mappings)
 
-    def _match_exact(self):
-        """Pass 1: Exact Name Match."""
-        exact_matches = pd.merge(
-            self.unmatched.reset_index(),
-            self.historical,
-            left_on="runner_name",
-            right_on="historical_name",
-        )
-        new_mappings = [
+    @staticmethod
+    def _join_historical(
+        unmatched: pd.DataFrame,
+        historical: pd.DataFrame,
+        left_key: str,
+        right_key: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Inner-joins unmatched Betfair players to historical players on a name key,
+        keeping the runner_id index so matched rows can be dropped without a reset.
+        """
+        right_key = right_key or left_key
+        historical_lookup = historical.set_index(right_key, drop=False)[
+            ["historical_id", "historical_name"]
+        ]
+        return unmatched.join(historical_lookup, on=left_key, how="inner")
+
+    @staticmethod
+    def _build_mappings(
+        matches: pd.DataFrame, confidence: float, method: str
+    ) -> list[dict]:
+        """Turns joined match rows into mapping records without per-row Series."""
+        return [
             {
-                "betfair_id": row["runner_id"],
-                "historical_id": row["historical_id"],
-                "betfair_name": row["runner_name"],
-                "matched_name": row["historical_name"],
-                "confidence": 100,
-                "method": "Exact",
+                "betfair_id": runner_id,
+                "historical_id": historical_id,
+                "betfair_name": runner_name,
+                "matched_name": historical_name,
+                "confidence": confidence,
+                "method": method,
             }
-            for _, row in exact_matches.iterrows()
+            for runner_id, historical_id, runner_name, historical_name in zip(
+                matches.index,
+                matches["historical_id"],
+                matches["runner_name"],
+                matches["historical_name"],
+            )
         ]
-        self.mappings.extend(new_mappings)
-        self.unmatched.drop(
-            index=exact_matches["runner_id"].tolist(), inplace=True, errors="ignore"
+
+    def _match_exact(self):
+        """Pass 1: Exact Name Match."""
+        exact_matches = self._join_historical(
+            self.unmatched, self.historical, "runner_name", "historical_name"
         )
+        self.mappings.extend(self._build_mappings(exact_matches, 100, "Exact"))
+        self.unmatched.drop(index=exact_matches.index, inplace=True, errors="ignore")
 
     def _match_cleaned(self):
         """Pass 2: Exact Match on Cleaned Names."""
@@ -84,27 +109,16 @@ class PlayerMapper:
         self.historical["cleaned_name"] = self.historical["historical_name"].apply(
             clean_name
         )
-        cleaned_matches = pd.merge(
-            self.unmatched.reset_index(), self.historical, on="cleaned_name"
+        cleaned_matches = self._join_historical(
+            self.unmatched, self.historical, "cleaned_name"
         )
         cleaned_matches.drop_duplicates(
             subset=["historical_id"], keep=False, inplace=True
         )
-        new_mappings = [
-            {
-                "betfair_id": row["runner_id"],
-                "historical_id": row["historical_id"],
-                "betfair_name": row["runner_name"],
-                "matched_name": row["historical_name"],
-                "confidence": 99.5,
-                "method": "Exact-Cleaned",
-            }
-            for _, row in cleaned_matches.iterrows()
-        ]
-        self.mappings.extend(new_mappings)
-        self.unmatched.drop(
-            index=cleaned_matches["runner_id"].tolist(), inplace=True, errors="ignore"
+        self.mappings.extend(
+            self._build_mappings(cleaned_matches, 99.5, "Exact-Cleaned")
         )
+        self.unmatched.drop(index=cleaned_matches.index, inplace=True, errors="ignore")
 
     def _match_initial_lastname(self):
         """Pass 3: Initial + Last Name Match."""
@@ -114,27 +128,16 @@ class PlayerMapper:
         self.unmatched["initial_lastname"] = self.unmatched["runner_name"].apply(
             get_initial_lastname
         )
-        initial_matches = pd.merge(
-            self.unmatched.reset_index(), self.historical, on="initial_lastname"
+        initial_matches = self._join_historical(
+            self.unmatched, self.historical, "initial_lastname"
         )
         initial_matches.drop_duplicates(
             subset=["historical_id"], keep=False, inplace=True
         )
-        new_mappings = [
-            {
-                "betfair_id": row["runner_id"],
-                "historical_id": row["historical_id"],
-                "betfair_name": row["runner_name"],
-                "matched_name": row["historical_name"],
-                "confidence": 99,
-                "method": "Initial+Lastname",
-            }
-            for _, row in initial_matches.iterrows()
-        ]
-        self.mappings.extend(new_mappings)
-        self.unmatched.drop(
-            index=initial_matches["runner_id"].tolist(), inplace=True, errors="ignore"
+        self.mappings.extend(
+            self._build_mappings(initial_matches, 99, "Initial+Lastname")
         )
+        self.unmatched.drop(index=initial_matches.index, inplace=True, errors="ignore")
 
     def _match_unique_lastname(self):
         """Pass 4: Unique Last Name Match."""
@@ -147,25 +150,14 @@ class PlayerMapper:
         historical_unique_lastname = self.historical[
             self.historical["lastname"].isin(unique_lastnames)
         ]
-        unique_lastname_matches = pd.merge(
-            self.unmatched.reset_index(), historical_unique_lastname, on="lastname"
+        unique_lastname_matches = self._join_historical(
+            self.unmatched, historical_unique_lastname, "lastname"
+        )
+        self.mappings.extend(
+            self._build_mappings(unique_lastname_matches, 98, "Unique Lastname")
         )
-        new_mappings = [
-            {
-                "betfair_id": row["runner_id"],
-                "historical_id": row["historical_id"],
-                "betfair_name": row["runner_name"],
-                "matched_name": row["historical_name"],
-                "confidence": 98,
-                "method": "Unique Lastname",
-            }
-            for _, row in unique_lastname_matches.iterrows()
-        ]
-        self.mappings.extend(new_mappings)
         self.unmatched.drop(
-            index=unique_lastname_matches["runner_id"].tolist(),
-            inplace=True,
-            errors="ignore",
+            index=unique_lastname_matches.index, inplace=True, errors="ignore"
         )
 
     def _match_fuzzy(self, tour: str):
@@ -186,45 +178,50 @@ class PlayerMapper:
                 block_key = last_name[0].upper()  # Group by first letter of last name
                 historical_blocks[block_key].append(name)
 
-        new_mappings = []
-        for betfair_id, row in tqdm(
-            self.unmatched.iterrows(),
-            total=len(self.unmatched),
-            desc=f"Fuzzy Matching ({tour.upper()})",
-        ):
-            betfair_name = row["runner_name"]
+        # Group the unmatched Betfair names into the same blocks
+        query_blocks = defaultdict(list)
+        for betfair_id, betfair_name in self.unmatched["runner_name"].items():
             if not isinstance(betfair_name, str) or not betfair_name.strip():
                 continue
-
-            # Determine which block to search in
             last_name = get_lastname(betfair_name)
-            if not last_name:
-                continue
-            block_key = last_name[0].upper()
-            candidate_list = historical_blocks.get(block_key)
+            if last_name:
+                query_blocks[last_name[0].upper()].append((betfair_id, betfair_name))
 
+        new_mappings = []
+        for block_key, queries in tqdm(
+            query_blocks.items(),
+            total=len(query_blocks),
+            desc=f"Fuzzy Matching ({tour.upper()})",
+        ):
+            candidate_list = historical_blocks.get(block_key)
             if not candidate_list:
                 continue  # No historical players with this initial, skip.
 
-            # Search only within the smaller candidate list
-            # rapidfuzz returns a tuple of (match, score, index)
-            result = process.extractOne(betfair_name, candidate_list)
-            if not result:
-                continue
-
-            best_match, score, _ = result
-
-            if score >= self.confidence_threshold:
-                new_mappings.append(
-                    {
-                        "betfair_id": betfair_id,
-                        "historical_id": historical_map[best_match],
-                        "betfair_name": betfair_name,
-                        "matched_name": best_match,
-                        "confidence": score,
-                        "method": "Fuzzy",
-                    }
-                )
+            # Score every query in the block against its candidates in one call
+            scores = process.cdist(
+                [name for _, name in queries],
+                candidate_list,
+                scorer=fuzz.WRatio,
+                workers=-1,
+            )
+            best_indices = scores.argmax(axis=1)
+
+            for (betfair_id, betfair_name), best_idx, row_scores in zip(
+                queries, best_indices, scores
+            ):
+                score = float(row_scores[best_idx])
+                if score >= self.confidence_threshold:
+                    best_match = candidate_list[best_idx]
+                    new_mappings.append(
+                        {
+                            "betfair_id": betfair_id,
+                            "historical_id": historical_map[best_match],
+                            "betfair_name": betfair_name,
+                            "matched_name": best_match,
+                            "confidence": score,
+                            "method": "Fuzzy",
+                        }
+                    )
         self.mappings.extend(new_mappings)
 
 
@@ -239,6 +236,24 @@ def run_create_mapping_file(data_paths: DataPaths, mapping_params: MappingParams
         log_error("Betfair RAW odds file not found. Please run 'prepare-data' first.")
         return
 
+    # Skip the (slow) mapping passes entirely when none of the inputs have changed
+    output_path = Path(data_paths.player_map)
+    signature_path = output_path.with_name(output_path.name + ".sig")
+    raw_data_dir = Path(data_paths.raw_data_dir)
+    input_files = [str(betfair_odds_path)]
+    for tour in ["atp", "wta"]:
+        input_files += glob.glob(
+            str(raw_data_dir / f"tennis_{tour}" / f"{tour}_matches_*.csv")
+        )
+    signature = get_files_signature(input_files, confidence_threshold)
+    if (
+        output_path.exists()
+        and signature_path.exists()
+        and signature_path.read_text() == signature
+    ):
+        log_success(f"Inputs unchanged. Using cached player map at {output_path}")
+        return
+
     df_betfair_odds = pd.read_csv(betfair_odds_path, low_memory=False)
     betfair_unique_players = (
         df_betfair_odds[["selection_id", "selection_name"]]
@@ -261,7 +276,6 @@ def run_create_mapping_file(data_paths: DataPaths, mapping_params: MappingParams
         by="confidence", ascending=False
     ).drop_duplicates(subset=["betfair_id"], keep="first")
 
-    output_path = Path(data_paths.player_map)
     final_mappings.to_csv(output_path, index=False)
 
     log_success(
@@ -274,3 +288,4 @@ def run_create_mapping_file(data_paths: DataPaths, mapping_params: MappingParams
 
     # Validate the final dataframe
     validate_data(final_mappings, "player_map", "Final Player Map")
+    signature_path.write_text(signature)
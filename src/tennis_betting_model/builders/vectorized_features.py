@@ -1,6 +1,8 @@
 # src/tennis_betting_model/builders/vectorized_features.py
 
+import numpy as np
 import pandas as pd
+from tennis_betting_model.utils.common import sort_by_date
 from tennis_betting_model.utils.logger import log_info
 
 
@@ -11,30 +13,33 @@ def build_vectorized_features(df_matches: pd.DataFrame) -> pd.DataFrame:
     """
     log_info("Preparing data for vectorization...")
 
-    # Ensure chronological order
-    df_matches = df_matches.sort_values("tourney_date").reset_index(drop=True)
-
-    # Create a long-format DataFrame where each row is one player's perspective of a match
-    winners = df_matches.copy()
-    winners = winners.rename(
-        columns={
-            "winner_historical_id": "player_id",
-            "loser_historical_id": "opponent_id",
-        }
+    # Ensure chronological order and use compact dtypes for the groupby/rolling scans
+    df_matches = sort_by_date(df_matches)
+    df_matches = df_matches.assign(
+        surface=df_matches["surface"].astype("category"),
+        winner_historical_id=df_matches["winner_historical_id"].astype("int32"),
+        loser_historical_id=df_matches["loser_historical_id"].astype("int32"),
     )
-    winners["won"] = 1
 
-    losers = df_matches.copy()
-    losers = losers.rename(
-        columns={
-            "loser_historical_id": "player_id",
-            "winner_historical_id": "opponent_id",
-        }
+    # Create a long-format DataFrame where each row is one player's perspective of a match.
+    # The shared match columns are stacked once and only the id/result columns differ.
+    n_matches = len(df_matches)
+    winner_ids = df_matches["winner_historical_id"].to_numpy()
+    loser_ids = df_matches["loser_historical_id"].to_numpy()
+    shared_cols = df_matches.columns.drop(
+        ["winner_historical_id", "loser_historical_id"]
     )
-    losers["won"] = 0
 
-    player_match_df = pd.concat([winners, losers], ignore_index=True)
-    player_match_df = player_match_df.sort_values("tourney_date").reset_index(drop=True)
+    player_match_df = pd.concat(
+        [df_matches[shared_cols], df_matches[shared_cols]], ignore_index=True
+    )
+    player_match_df["player_id"] = np.concatenate([winner_ids, loser_ids])
+    player_match_df["opponent_id"] = np.concatenate([loser_ids, winner_ids])
+    player_match_df["won"] = np.concatenate(
+        [np.ones(n_matches, dtype=np.int8), np.zeros(n_matches, dtype=np.int8)]
+    )
+    # Two already-sorted halves, so the stable argsort is a cheap merge
+    player_match_df = sort_by_date(player_match_df)
 
     log_info("Calculating rolling and expanding player statistics...")
 
@@ -56,13 +61,16 @@ def build_vectorized_features(df_matches: pd.DataFrame) -> pd.DataFrame:
         }
     )
 
-    # Surface-specific win percentage
-    surface_stats = (
-        player_match_df.groupby(["player_id", "surface"])["won"]
-        .expanding()
-        .mean()
-        .shift(1)
+    # Surface-specific win percentage from cumulative counts and wins per
+    # (player, surface), excluding the current match.
+    surface_grouped = player_match_df.groupby(
+        ["player_id", "surface"], sort=False, observed=True
     )
+    prev_surface_matches = surface_grouped.cumcount()
+    prev_surface_wins = surface_grouped["won"].cumsum() - player_match_df["won"]
+    surface_win_perc = (
+        prev_surface_wins / prev_surface_matches.where(prev_surface_matches > 0)
+    ).fillna(0)
 
     # Fatigue metrics
     player_match_df.set_index("tourney_date", inplace=True)
@@ -85,52 +93,45 @@ def build_vectorized_features(df_matches: pd.DataFrame) -> pd.DataFrame:
 
     # Explicitly align the index of player_stats before concatenation.
     player_stats.index = player_match_df.index
+    player_stats["surface_win_perc"] = surface_win_perc.to_numpy()
+
+    # Fill NaNs for players' first matches
+    player_stats = player_stats.fillna(0).astype("float32")
     player_features_df = pd.concat([player_match_df, player_stats], axis=1)
 
-    # Merge surface_stats by making join keys explicit columns
-    player_features_df.reset_index(inplace=True)
-    surface_stats_df = surface_stats.reset_index(name="surface_win_perc").rename(
-        columns={"level_2": "index"}
+    log_info("Reconstructing match-wise feature data...")
+
+    # Pivot the data back to a match-wise format. Every match has exactly one row per
+    # player, so each side is a hash lookup on (match_id, player_id) rather than a merge.
+    player_features_df = player_features_df.set_index(["match_id", "player_id"])
+    player_features_df = player_features_df.drop(
+        columns=["opponent_id", "p1_id", "p2_id"], errors="ignore"
     )
-    player_features_df = player_features_df.merge(
-        surface_stats_df, on=["player_id", "surface", "index"], how="left"
-    ).drop(columns=["index"])
 
-    # Fill NaNs for players' first matches
-    player_features_df.fillna(0, inplace=True)
+    p1_pos = player_features_df.index.get_indexer(
+        pd.MultiIndex.from_arrays([df_matches["match_id"], df_matches["p1_id"]])
+    )
+    p2_pos = player_features_df.index.get_indexer(
+        pd.MultiIndex.from_arrays([df_matches["match_id"], df_matches["p2_id"]])
+    )
 
-    log_info("Reconstructing match-wise feature data...")
+    # Keep only matches where both players were found, as an inner join would
+    found = (p1_pos >= 0) & (p2_pos >= 0)
+    p1_features = (
+        player_features_df.iloc[p1_pos[found]].add_prefix("p1_").reset_index(drop=True)
+    )
+    p2_features = (
+        player_features_df.iloc[p2_pos[found]].add_prefix("p2_").reset_index(drop=True)
+    )
+
+    final_df: pd.DataFrame = pd.concat(
+        [df_matches[found].reset_index(drop=True), p1_features, p2_features], axis=1
+    )
 
-    # Pivot the data back to a match-wise format
-    p1_features = player_features_df.add_prefix("p1_")
-    p2_features = player_features_df.add_prefix("p2_")
-
-    # FIX: Perform the merges FIRST, then drop the redundant columns AFTER.
-    merged_df = df_matches.merge(
-        p1_features,
-        left_on=["match_id", "p1_id"],
-        right_on=["p1_match_id", "p1_player_id"],
-    )
-
-    final_df = merged_df.merge(
-        p2_features,
-        left_on=["match_id", "p2_id"],
-        right_on=["p2_match_id", "p2_player_id"],
-    )
-
-    # Define and drop the specific, known redundant columns after all merges are complete
-    cols_to_drop = [
-        "p1_match_id",
-        "p1_player_id",
-        "p1_opponent_id",
-        "p1_p1_id",
-        "p1_p2_id",
-        "p2_match_id",
-        "p2_player_id",
-        "p2_opponent_id",
-        "p2_p1_id",
-        "p2_p2_id",
-    ]
-    final_df.drop(columns=cols_to_drop, inplace=True, errors="ignore")
-
-    return final_df
+    # The category dtype was only for the scans above. Surface columns leave as
+    # plain strings, so the copied p1_/p2_surface are not picked up as model
+    # features and the model's categoricals stay CATEGORICAL_FEATURES.
+    surface_cols = final_df.columns.intersection(
+        ["surface", "p1_surface", "p2_surface"]
+    )
+    return final_df.astype({col: object for col in surface_cols})
@@ -3,8 +3,9 @@
 import pandas as pd
 import streamlit as st
 import numpy as np
-from typing import cast, Tuple, List, Any
+from typing import cast, Dict, Tuple, List, Any
 import datetime
+from types import SimpleNamespace
 import plotly.express as px
 from omegaconf import OmegaConf
 
@@ -13,45 +14,99 @@ from tennis_betting_model.utils.config import validate_config
 from tennis_betting_model.utils.config_schema import Config, DataPaths
 from tennis_betting_model.utils.data_loader import DataLoader
 from tennis_betting_model.pipeline.simulate_bankroll_growth import (
+    SIMULATION_COLUMNS,
     simulate_bankroll_growth,
     calculate_max_drawdown,
+    warm_up_simulation,
 )
 
+# Pay the one-off kernel compilation at startup rather than on first interaction
+warm_up_simulation()
 
-@st.cache_data
-def load_data(_paths: DataPaths) -> pd.DataFrame:
-    """Wrapper function to cache the data loading."""
+
+@st.cache_resource
+def load_arrays(_paths: DataPaths) -> SimpleNamespace:
+    """
+    Loads the backtest data once per process and exposes the filter columns as
+    numpy arrays. The result is shared across sessions without being copied, so
+    callers must treat it as read-only.
+    """
     data_loader = DataLoader(_paths)
-    return cast(pd.DataFrame, data_loader.load_backtest_data_for_dashboard())
+    df = cast(pd.DataFrame, data_loader.load_backtest_data_for_dashboard())
+    if df.empty:
+        return SimpleNamespace(df=df)
+    odds = df["odds"].to_numpy()
+    ev = df["expected_value"].to_numpy()
+    date = df["tourney_date"].to_numpy(dtype="datetime64[ns]")
+    dated = date[~np.isnat(date)]  # sorted, with any NaT at the end
+    return SimpleNamespace(
+        df=df,
+        odds=odds,
+        ev=ev,
+        date=date,
+        pnl=df["pnl"].to_numpy(),
+        # Widget bounds, reduced once here rather than on every rerun
+        stats={
+            "odds_max": float(np.nanmax(odds)),
+            "ev_min": float(np.nanmin(ev)),
+            "ev_max": float(np.nanmax(ev)),
+            "min_date": pd.Timestamp(dated[0]).date(),
+            "max_date": pd.Timestamp(dated[-1]).date(),
+        },
+    )
 
 
-def create_summary_table(
-    df: pd.DataFrame, column: str, bins: List[Any], title: str
-) -> None:
-    """Creates and displays a summary table for a given column, bucketing the data."""
-    st.subheader(title)
-    if column not in df.columns or df[column].isnull().all() or df.empty:
-        st.warning(f"Data for '{column}' is not available to generate summary.")
-        return
+def summarize_buckets(
+    df: pd.DataFrame, bin_specs: Dict[str, List[Any]]
+) -> Dict[str, pd.DataFrame | None]:
+    """
+    Buckets several columns of the filtered bets in one pass, sharing the pnl
+    weights between them. Returns a summary per column, or None when the column
+    has no data to summarize.
+    """
+    pnl_weights = df["pnl"].fillna(0).to_numpy()
+    summaries: Dict[str, pd.DataFrame | None] = {}
+    for column, bins in bin_specs.items():
+        if column not in df.columns or df[column].isnull().all() or df.empty:
+            summaries[column] = None
+            continue
+
+        bin_edges = np.asarray(sorted(set([-np.inf] + bins + [np.inf])), dtype=float)
+        n_buckets = len(bin_edges) - 1
+
+        # Bucket ids via binary search on the inner edges; right=True reproduces
+        # the right-closed (a, b] intervals pd.cut would have produced
+        values = df[column].to_numpy(dtype=float)
+        has_value = ~np.isnan(values)
+        ids = np.digitize(values[has_value], bin_edges[1:-1], right=True)
+        bets = np.bincount(ids, minlength=n_buckets)
+        pnl = np.bincount(ids, weights=pnl_weights[has_value], minlength=n_buckets)
+
+        occupied = bets > 0
+        bets, pnl = bets[occupied], pnl[occupied]
+        roi = (pnl / bets) * 100
+        # Format once in numpy and hand Streamlit plain strings instead of a
+        # Styler, which would re-run Python format strings cell by cell
+        summaries[column] = pd.DataFrame(
+            {
+                f"{column}_bucket": pd.IntervalIndex.from_breaks(bin_edges)[occupied],
+                "bets": bets,
+                "pnl": np.char.mod("%.2f", pnl),
+                "roi": np.char.add(np.char.mod("%.2f", roi), "%"),
+            }
+        )
+    return summaries
 
-    bin_edges = sorted(list(set([-np.inf] + bins + [np.inf])))
 
-    df[f"{column}_bucket"] = pd.cut(df[column], bins=bin_edges)
-    summary = (
-        df.groupby(f"{column}_bucket", observed=False)
-        .agg(bets=("market_id", "count"), pnl=("pnl", "sum"))
-        .reset_index()
-    )
-    summary = summary[summary["bets"] > 0].copy()
-    if summary.empty:
+def create_summary_table(summary: pd.DataFrame | None, column: str, title: str) -> None:
+    """Displays a bucketed summary table produced by summarize_buckets."""
+    st.subheader(title)
+    if summary is None:
+        st.warning(f"Data for '{column}' is not available to generate summary.")
+    elif summary.empty:
         st.warning(f"No data falls into the defined bins for '{column}'.")
-        return
-
-    summary["roi"] = (summary["pnl"] / summary["bets"]) * 100
-    st.dataframe(
-        summary.style.format({"pnl": "{:.2f}", "roi": "{:.2f}%"}),
-        use_container_width=True,
-    )
+    else:
+        st.dataframe(summary, use_container_width=True)
 
 
 def run() -> None:
@@ -70,7 +125,8 @@ def run() -> None:
         config_dict = validate_config(base_cfg)
         config = Config(**config_dict)
         analysis_params = config.analysis_params.dict()
-        df_full = load_data(config.data_paths)
+        data = load_arrays(config.data_paths)
+        df_full = data.df
     except Exception as e:
         st.error(f"Failed to load configuration or data. Error: {e}")
         return
@@ -81,8 +137,8 @@ def run() -> None:
 
     st.sidebar.header("Master Strategy Filters")
 
-    min_date = df_full["tourney_date"].min().date()
-    max_date = df_full["tourney_date"].max().date()
+    stats = data.stats
+    min_date, max_date = stats["min_date"], stats["max_date"]
 
     date_range = st.sidebar.date_input(
         "Date Range", value=(min_date, max_date), min_value=min_date, max_value=max_date
@@ -91,16 +147,16 @@ def run() -> None:
     odds_range = st.sidebar.slider(
         "Odds Range",
         min_value=1.0,
-        max_value=float(df_full["odds"].max()),
+        max_value=stats["odds_max"],
         value=(1.0, 10.0),
         step=0.1,
     )
 
     ev_range = st.sidebar.slider(
         "Expected Value (EV) Range",
-        min_value=float(df_full["expected_value"].min()),
-        max_value=float(df_full["expected_value"].max()),
-        value=(0.0, float(df_full["expected_value"].max())),
+        min_value=stats["ev_min"],
+        max_value=stats["ev_max"],
+        value=(0.0, stats["ev_max"]),
         step=0.01,
     )
 
@@ -111,24 +167,28 @@ def run() -> None:
     start_date, end_date = pd.to_datetime(date_range_tuple[0]), pd.to_datetime(
         date_range_tuple[1]
     )
-    df = df_full[
-        (df_full["tourney_date"] >= start_date)
-        & (df_full["tourney_date"] <= end_date)
-        & (df_full["odds"] >= odds_range_tuple[0])
-        & (df_full["odds"] <= odds_range_tuple[1])
-        & (df_full["expected_value"] >= ev_range_tuple[0])
-        & (df_full["expected_value"] <= ev_range_tuple[1])
-    ].copy()
+    odds_lo, odds_hi = odds_range_tuple
+    ev_lo, ev_hi = ev_range_tuple
+
+    # df_full is sorted by date, so the date filter is a binary-searched slice and
+    # the remaining clauses form one boolean mask over the cached arrays
+    lo = int(np.searchsorted(data.date, np.datetime64(start_date), side="left"))
+    hi = int(np.searchsorted(data.date, np.datetime64(end_date), side="right"))
+    odds, ev = data.odds[lo:hi], data.ev[lo:hi]
+    mask = (odds >= odds_lo) & (odds <= odds_hi) & (ev >= ev_lo) & (ev <= ev_hi)
+    rows = lo + np.flatnonzero(mask)
+    df = df_full.iloc[rows]
 
     if df.empty:
         st.info("No bets match the current filter criteria.")
         return
 
     st.header("📈 Performance Overview")
-    total_bets = len(df)
-    total_pnl = df["pnl"].sum()
+    # KPIs reduce directly over the cached arrays for the selected rows
+    total_bets = len(rows)
+    total_pnl = np.nansum(data.pnl[rows])
     roi = (total_pnl / total_bets) * 100 if total_bets > 0 else 0
-    avg_odds = df["odds"].mean()
+    avg_odds = np.nanmean(data.odds[rows])
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Bets", f"{total_bets:,}")
@@ -159,8 +219,9 @@ def run() -> None:
         )
         max_stake_cap = st.slider("Max Stake Cap (% of Bankroll)", 1, 100, 5, 1)
 
+    # The simulation works on a renamed copy, so a column projection suffices
     simulated_df = simulate_bankroll_growth(
-        df.copy(),
+        df[[c for c in SIMULATION_COLUMNS if c in df.columns]],
         config.simulation_params.dict(),
         initial_bankroll=initial_bankroll,
         strategy=staking_strategy,
@@ -194,27 +255,25 @@ def run() -> None:
     st.header("📊 Performance Breakdown")
     breakdown_col1, breakdown_col2 = st.columns(2)
 
+    summaries = summarize_buckets(
+        df,
+        {
+            "odds": analysis_params.get("odds_bins", []),
+            "expected_value": analysis_params.get("ev_bins", []),
+            "rank_diff": analysis_params.get("rank_bins", []),
+        },
+    )
+
     with breakdown_col1:
-        create_summary_table(
-            df.copy(),
-            "odds",
-            analysis_params.get("odds_bins", []),
-            "By Odds Bucket",
-        )
+        create_summary_table(summaries["odds"], "odds", "By Odds Bucket")
 
     with breakdown_col2:
         create_summary_table(
-            df.copy(),
-            "expected_value",
-            analysis_params.get("ev_bins", []),
-            "By Expected Value (EV)",
+            summaries["expected_value"], "expected_value", "By Expected Value (EV)"
         )
 
     create_summary_table(
-        df.copy(),
-        "rank_diff",
-        analysis_params.get("rank_bins", []),
-        "By Player Rank Difference",
+        summaries["rank_diff"], "rank_diff", "By Player Rank Difference"
     )
 
     st.divider()
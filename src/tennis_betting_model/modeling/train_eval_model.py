@@ -1,49 +1,541 @@
 # src/tennis_betting_model/modeling/train_eval_model.py
 import pandas as pd
+import numpy as np
 import lightgbm as lgb
 import joblib
 import optuna
-import matplotlib.pyplot as plt
+import pyarrow as pa
+import pyarrow.parquet as pq
+from optuna.trial import FrozenTrial, TrialState
+from matplotlib.figure import Figure
 from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
 from sklearn.model_selection import StratifiedKFold
 from pathlib import Path
-from typing import cast
+from typing import Callable, cast
+from functools import lru_cache
+import gc
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from src.tennis_betting_model.utils.config_schema import Config
-from src.tennis_betting_model.utils.logger import log_info, log_error, log_success
+from src.tennis_betting_model.utils.logger import (
+    log_info,
+    log_error,
+    log_success,
+    log_warning,
+)
+from src.tennis_betting_model.utils.constants import CATEGORICAL_FEATURES
+from src.tennis_betting_model.utils.common import to_feature_library_dtypes
+from src.tennis_betting_model.utils.file_utils import is_cache_fresh
 
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
+STUDY_NAME = "puntingpro_lgbm"
+# Upper bound on boosting rounds; early stopping picks the actual tree count.
+MAX_BOOST_ROUNDS = 2000
+# Coarser histograms halve their memory footprint with negligible loss in AUC.
+MAX_BIN = 127
+# The GPU only pays off once its transfer overhead is amortized over enough
+# data; below these sizes training stays on the CPU even when asked for a GPU.
+GPU_MIN_ROWS = 500_000
+GPU_MIN_FEATURES = 30
+GPU_MAX_BIN = 63
+# The pickled booster is mostly its text model string, which compresses well.
+MODEL_COMPRESSION = ("zlib", 3)
+# Trials whose parameters all lie within this fraction of their search range of
+# a recent completed trial reuse its score instead of fitting again.
+DUPLICATE_TOLERANCE = 1e-3
+DUPLICATE_LOOKBACK = 50
+# Labels, keys and dates that must never reach the model. Several of these
+# leaked the outcome and were identified from the feature importance plot.
+IDENTIFIER_COLS = frozenset(
+    {
+        "winner",
+        "market_id",
+        "p1_id",
+        "p2_id",
+        "tourney_date",
+        "winner_id",
+        "winner_historical_id",
+        "loser_id",
+        "loser_historical_id",
+        "p1_tourney_date",
+        "p2_tourney_date",
+        "p1_won",
+        "p2_won",
+        "p1_winner_id",
+        "p1_loser_id",
+        "p2_winner_id",
+        "p2_loser_id",
+    }
+)
+# Parameter groups tuned one after another by the "stepwise" strategy; each
+# stage searches its own group with the others pinned to the best so far.
+STEPWISE_STAGES = [
+    ("boosting_type", "learning_rate", "n_estimators", "drop_rate", "skip_drop"),
+    ("num_leaves", "min_child_samples"),
+    ("subsample", "colsample_bytree"),
+    ("reg_alpha", "reg_lambda"),
+]
+
+
+@lru_cache(maxsize=1)
+def _gpu_available() -> bool:
+    """Probes once whether the installed LightGBM build can train on a GPU."""
+    X = np.random.default_rng(42).random((64, 2))
+    y = np.arange(64) % 2
+    try:
+        lgb.train(
+            {"objective": "binary", "device_type": "gpu", "verbosity": -1},
+            lgb.Dataset(X, label=y),
+            num_boost_round=1,
+        )
+    except lgb.basic.LightGBMError:
+        return False
+    return True
+
+
+def _use_gpu(training_params: dict, X: pd.DataFrame) -> bool:
+    """Whether a GPU was requested, is usable, and the data is large enough."""
+    if training_params.get("device", "cpu") != "gpu":
+        return False
+    if len(X) < GPU_MIN_ROWS or X.shape[1] < GPU_MIN_FEATURES:
+        return False
+    if not _gpu_available():
+        log_warning("GPU training requested but unavailable; using the CPU.")
+        return False
+    return True
+
+
+def _runtime_params(num_threads: int, use_gpu: bool = False) -> dict:
+    """LightGBM device, threading and histogram settings shared by every fit."""
+    params: dict = {
+        "num_threads": num_threads,
+        "force_col_wise": True,
+        "max_bin": MAX_BIN,
+        "deterministic": False,
+    }
+    if use_gpu:
+        params.update(
+            {"device_type": "gpu", "gpu_use_dp": False, "max_bin": GPU_MAX_BIN}
+        )
+    return params
+
+
+def _pruning_callback(trial: optuna.Trial, metric: str = "auc"):
+    """
+    LightGBM callback that reports the validation metric to Optuna after each
+    boosting round and aborts the fit once the pruner flags the trial.
+    """
+
+    def _callback(env: lgb.callback.CallbackEnv) -> None:
+        # Entries are (dataset, metric, score, higher_is_better[, stdev])
+        for entry in env.evaluation_result_list or []:
+            eval_name, score = entry[1], entry[2]
+            if eval_name == metric:
+                trial.report(score, step=env.iteration)
+                if trial.should_prune():
+                    raise optuna.TrialPruned(
+                        f"Trial pruned at iteration {env.iteration}."
+                    )
+                return
+
+    return _callback
+
+
+def _param_distance(distribution: optuna.distributions.BaseDistribution, a, b) -> float:
+    """Distance between two values as a fraction of the parameter's search range."""
+    if isinstance(distribution, optuna.distributions.CategoricalDistribution):
+        return 0.0 if a == b else np.inf
+    low, high = distribution.low, distribution.high  # type: ignore[attr-defined]
+    if distribution.log:  # type: ignore[attr-defined]
+        a, b, low, high = np.log(a), np.log(b), np.log(low), np.log(high)
+    return abs(a - b) / (high - low) if high > low else 0.0
+
+
+def _find_duplicate_trial(
+    trial: optuna.Trial, data_fingerprint: str = ""
+) -> FrozenTrial | None:
+    """
+    Returns a recently completed trial with (almost) the same parameters that was
+    scored on the same data.
+    """
+    completed = trial.study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+    for prior in reversed(completed[-DUPLICATE_LOOKBACK:]):
+        # Reusing a score also reuses its tree count, so the prior must have one
+        if (
+            prior.params.keys() != trial.params.keys()
+            or "best_iteration" not in prior.user_attrs
+            or prior.user_attrs.get("data_fingerprint") != data_fingerprint
+        ):
+            continue
+        if all(
+            _param_distance(dist, trial.params[name], prior.params[name])
+            <= DUPLICATE_TOLERANCE
+            for name, dist in trial.distributions.items()
+        ):
+            return prior
+    return None
+
+
+def _fit_score(
+    params: dict,
+    num_boost_round: int,
+    early_stopping_rounds: int,
+    data_fingerprint: str,
+    dtrain: lgb.Dataset,
+    dval: lgb.Dataset,
+    runtime_params: dict,
+    trial: optuna.Trial,
+) -> tuple[float, int]:
+    """
+    Fits one trial's booster on the shared Datasets and returns its validation
+    AUC and best iteration. data_fingerprint identifies the Datasets, their
+    binning and the training device when the function is memoized with
+    joblib.Memory, which ignores the remaining unhashable arguments.
+    """
+    # The shared Datasets are already binned, so only the boosting loop runs here.
+    booster = lgb.train(
+        {**runtime_params, **params},
+        dtrain,
+        num_boost_round=num_boost_round,
+        valid_sets=[dval],
+        valid_names=["valid"],
+        callbacks=[
+            lgb.early_stopping(early_stopping_rounds, verbose=False),
+            _pruning_callback(trial, "auc"),
+        ],
+    )
+    best_iteration = booster.best_iteration or booster.current_iteration()
+    return float(booster.best_score["valid"]["auc"]), best_iteration
+
 
 def objective_lgbm(
-    trial: optuna.Trial, X_train, y_train, X_val, y_val, early_stopping_rounds: int
+    trial: optuna.Trial,
+    dtrain: lgb.Dataset,
+    dval: lgb.Dataset,
+    early_stopping_rounds: int,
+    runtime_params: dict | None = None,
+    fit_score: Callable[..., tuple[float, int]] = _fit_score,
+    data_fingerprint: str = "",
 ) -> float:
     params = {
         "objective": "binary",
         "metric": "auc",
         "verbosity": -1,
+        "feature_pre_filter": False,
+        "seed": 42,
         "boosting_type": trial.suggest_categorical("boosting_type", ["gbdt", "dart"]),
-        "n_estimators": trial.suggest_int("n_estimators", 100, 1000),
-        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3),
-        "num_leaves": trial.suggest_int("num_leaves", 20, 300),
-        "max_depth": trial.suggest_int("max_depth", 3, 12),
+        "learning_rate": trial.suggest_float("learning_rate", 1e-3, 0.3, log=True),
+        "num_leaves": trial.suggest_int("num_leaves", 20, 300, log=True),
+        "min_child_samples": trial.suggest_int("min_child_samples", 5, 100, log=True),
+        "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
+        "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
         "subsample": trial.suggest_float("subsample", 0.6, 1.0),
         "colsample_bytree": trial.suggest_float("colsample_bytree", 0.6, 1.0),
     }
+    num_boost_round = MAX_BOOST_ROUNDS
 
     if params["boosting_type"] == "dart":
+        # DART ignores early stopping, so its tree count stays a tuned parameter.
+        num_boost_round = trial.suggest_int("n_estimators", 100, 1000)
         params["drop_rate"] = trial.suggest_float("drop_rate", 0.1, 0.5)
         params["skip_drop"] = trial.suggest_float("skip_drop", 0.1, 0.5)
 
-    model = lgb.LGBMClassifier(**params, random_state=42)  # type: ignore
-    model.fit(
-        X_train,
-        y_train,
-        eval_set=[(X_val, y_val)],
-        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)],
+    trial.set_user_attr("data_fingerprint", data_fingerprint)
+    # TPE occasionally proposes a point it has effectively already evaluated.
+    duplicate = _find_duplicate_trial(trial, data_fingerprint)
+    if duplicate is not None:
+        trial.set_user_attr("duplicate_of", duplicate.number)
+        trial.set_user_attr("best_iteration", duplicate.user_attrs["best_iteration"])
+        return cast(float, duplicate.value)
+
+    score, best_iteration = fit_score(
+        params,
+        num_boost_round,
+        early_stopping_rounds,
+        data_fingerprint,
+        dtrain,
+        dval,
+        runtime_params or {},
+        trial,
+    )
+    trial.set_user_attr("best_iteration", best_iteration)
+    return score
+
+
+@dataclass
+class TrainingSplits:
+    """Chronological splits of the feature matrix used for tuning and evaluation."""
+
+    X_train_main: pd.DataFrame
+    y_train_main: pd.Series
+    X_test: pd.DataFrame
+    y_test: pd.Series
+    # Rows of the *_train_main frames from this position on form the
+    # validation set used for early stopping during tuning.
+    val_start: int
+
+
+def _to_float32_matrix(X: pd.DataFrame) -> np.ndarray:
+    """
+    Packs the features into one C-contiguous float32 array, with categoricals
+    as their codes (missing -> NaN), so LightGBM bins row slices of it without
+    any further conversion or copying.
+    """
+    matrix = np.empty(X.shape, dtype=np.float32)
+    for j, col in enumerate(X.columns):
+        values = X[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            matrix[:, j] = np.where(codes >= 0, codes, np.nan)
+        else:
+            matrix[:, j] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+    return matrix
+
+
+def _sample_training_data(data: pd.DataFrame, training_params: dict) -> pd.DataFrame:
+    max_samples = training_params.get("max_training_samples")
+    if max_samples and len(data) > max_samples:
+        log_info(f"Taking a random sample of {max_samples} for faster optimization...")
+        # Same rows as data.sample(n, random_state=42), kept in their original
+        # (chronological) order so the splits can slice instead of gather.
+        rows = np.random.RandomState(42).choice(len(data), max_samples, replace=False)
+        data = data.take(np.sort(rows))
+    return data
+
+
+def _prepare_splits(
+    data: pd.DataFrame, training_params: dict, test_size: float
+) -> TrainingSplits:
+    """Builds the feature matrix and splits it chronologically."""
+    data.columns = data.columns.str.replace(r"[\[\]<]", "", regex=True)
+    # Only the split boundaries depend on time order, so the (wide) frame is never
+    # sorted; each split gathers its rows from a stable argsort of the dates.
+    order = np.argsort(pd.to_datetime(data["tourney_date"]).to_numpy(), kind="stable")
+
+    # Exclude categorical columns from being dropped, LightGBM splits on them natively.
+    # Any other text or category column is dropped, so the model's categoricals are
+    # exactly CATEGORICAL_FEATURES, as live scoring and the backtest assume.
+    non_feature_cols = data.select_dtypes(
+        include=["object", "category"]
+    ).columns.difference(CATEGORICAL_FEATURES)
+    cols_to_drop = data.columns.intersection(
+        non_feature_cols.union(sorted(IDENTIFIER_COLS))
+    )
+
+    X = data.drop(columns=cols_to_drop)
+    y = data["winner"]
+
+    # Single-precision numerics and category codes halve the bytes LightGBM
+    # streams while binning, compared with float64 and one-hot columns.
+    # Columns already stored as float32 (e.g. from the Parquet copy) are left as is.
+    num_cols = X.select_dtypes(include="number", exclude="float32").columns
+    if len(num_cols):
+        X[num_cols] = X[num_cols].astype("float32")
+    for col in CATEGORICAL_FEATURES:
+        X[col] = X[col].astype("category")
+
+    split_index = int(len(data) * (1 - test_size))
+    train_rows: slice | np.ndarray
+    test_rows: slice | np.ndarray
+    if (order[1:] > order[:-1]).all():
+        # Already chronological: contiguous slices avoid a gathered copy.
+        train_rows, test_rows = slice(None, split_index), slice(split_index, None)
+    else:
+        train_rows, test_rows = order[:split_index], order[split_index:]
+    X_train_main, y_train_main = X.iloc[train_rows], y.iloc[train_rows]
+
+    validation_size = training_params.get("validation_size", 0.25)
+    val_split_index = int(len(X_train_main) * (1 - validation_size))
+    return TrainingSplits(
+        X_train_main=X_train_main,
+        y_train_main=y_train_main,
+        X_test=X.iloc[test_rows],
+        y_test=y.iloc[test_rows],
+        val_start=val_split_index,
+    )
+
+
+def _study_name(data: pd.DataFrame) -> str:
+    """
+    Names the study after the full feature library, so rerunning on the same data
+    resumes the study while any refresh or schema change starts a new one. Scores
+    from different data versions are never compared.
+    """
+    digest = hashlib.md5("|".join(map(str, data.columns)).encode())
+    row_hashes = pd.util.hash_pandas_object(data, index=False)
+    digest.update(row_hashes.to_numpy().tobytes())
+    return f"{STUDY_NAME}_{digest.hexdigest()[:8]}"
+
+
+def _create_study(training_params: dict, study_name: str = STUDY_NAME) -> optuna.Study:
+    """
+    Creates the hyperparameter study, or attaches to an existing one when a
+    storage URL is configured. The OPTUNA_STORAGE environment variable takes
+    precedence over the config so that workers on other machines can share a
+    database-backed study.
+    """
+    storage = os.environ.get("OPTUNA_STORAGE") or training_params.get("optuna_storage")
+    if storage and storage.startswith("sqlite:///"):
+        Path(storage.removeprefix("sqlite:///")).parent.mkdir(
+            parents=True, exist_ok=True
+        )
+    return optuna.create_study(
+        direction="maximize",
+        sampler=optuna.samplers.TPESampler(
+            n_startup_trials=10, multivariate=True, group=True, seed=42
+        ),
+        pruner=optuna.pruners.HyperbandPruner(
+            min_resource=20, max_resource=MAX_BOOST_ROUNDS, reduction_factor=3
+        ),
+        storage=storage,
+        study_name=study_name if storage else None,
+        load_if_exists=bool(storage),
+    )
+
+
+def _enqueue_previous_best(study: optuna.Study, metrics_path: Path) -> None:
+    """
+    Seeds the search with the best parameters recorded by the previous training
+    run, so the first trial already starts from a known-good configuration.
+    """
+    if not metrics_path.exists():
+        return
+    try:
+        with open(metrics_path) as f:
+            previous_best = json.load(f)["best_params"]
+    except (OSError, ValueError, KeyError) as e:
+        log_warning(f"Could not read previous best params from {metrics_path}: {e}")
+        return
+    # Older metrics recorded the final tree count here, which only DART tunes
+    if previous_best.get("boosting_type") != "dart":
+        previous_best.pop("n_estimators", None)
+    study.enqueue_trial(previous_best, skip_if_exists=True)
+    log_info(f"Warm-starting the search from the best parameters in {metrics_path}")
+
+
+def _run_study(
+    study: optuna.Study,
+    splits: TrainingSplits,
+    training_params: dict,
+    cache_dir: Path,
+) -> None:
+    """Runs this process's share of trials against the study."""
+    early_stopping_rounds = training_params.get("early_stopping_rounds", 50)
+    cpu_count = os.cpu_count() or 1
+    threads_per_trial = training_params.get("threads_per_trial") or 2
+    n_jobs = training_params.get("n_jobs") or max(1, cpu_count // threads_per_trial)
+    # Split the cores between concurrent trials rather than oversubscribing them.
+    trial_params = _runtime_params(
+        max(1, cpu_count // n_jobs), _use_gpu(training_params, splits.X_train_main)
+    )
+    # Bin the training and validation data once and share it across all trials.
+    # Construction happens eagerly so that parallel trials never race on it.
+    dataset_params = {
+        "feature_pre_filter": False,
+        "verbosity": -1,
+        "max_bin": trial_params["max_bin"],
+    }
+    X_np = _to_float32_matrix(splits.X_train_main)
+    y_np = splits.y_train_main.to_numpy()
+    feature_names = list(splits.X_train_main.columns)
+    val_start = splits.val_start
+    dtrain = lgb.Dataset(
+        X_np[:val_start],
+        label=y_np[:val_start],
+        params=dataset_params,
+        feature_name=feature_names,
+        categorical_feature=[feature_names.index(c) for c in CATEGORICAL_FEATURES],
+        free_raw_data=False,
+    ).construct()
+    dval = dtrain.create_valid(
+        X_np[val_start:], label=y_np[val_start:], params=dataset_params
+    ).construct()
+    # Memoize trial fits on disk so repeated or resumed searches over the same
+    # data skip configurations that were already evaluated.
+    memory = joblib.Memory(cache_dir, verbose=0)
+    fit_score = memory.cache(
+        _fit_score,
+        ignore=["dtrain", "dval", "runtime_params", "trial"],
+    )
+    # The bins (max_bin) and the device change the fit, so they key the cache too
+    data_fingerprint = joblib.hash(
+        (
+            X_np,
+            y_np,
+            val_start,
+            feature_names,
+            dataset_params,
+            trial_params.get("device_type", "cpu"),
+        )
     )
-    y_pred_proba = model.predict_proba(X_val)[:, 1]
-    return cast(float, roc_auc_score(y_val, y_pred_proba))
+
+    # Trials are independent and LightGBM releases the GIL, so they can run
+    # concurrently within this process as well as across worker processes.
+    def objective(trial: optuna.Trial) -> float:
+        return objective_lgbm(
+            trial,
+            dtrain,
+            dval,
+            early_stopping_rounds,
+            trial_params,
+            fit_score,
+            data_fingerprint,
+        )
+
+    n_trials = training_params["hyperparameter_trials"]
+    if training_params.get("tuning_strategy", "tpe") != "stepwise":
+        study.optimize(
+            objective,
+            n_trials=n_trials,
+            n_jobs=n_jobs,
+            gc_after_trial=True,
+            show_progress_bar=True,
+        )
+        return
+
+    # Coordinate-descent style search: a few small joint searches converge in
+    # fewer trials than one search over every parameter at once.
+    base_sampler = study.sampler
+    trials_per_stage = max(1, n_trials // len(STEPWISE_STAGES))
+    try:
+        for stage in STEPWISE_STAGES:
+            completed = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+            fixed = (
+                {k: v for k, v in study.best_params.items() if k not in stage}
+                if completed
+                else {}
+            )
+            study.sampler = optuna.samplers.PartialFixedSampler(fixed, base_sampler)
+            log_info(f"Stepwise tuning stage: {', '.join(stage)}")
+            study.optimize(
+                objective,
+                n_trials=trials_per_stage,
+                n_jobs=n_jobs,
+                gc_after_trial=True,
+                show_progress_bar=True,
+            )
+    finally:
+        study.sampler = base_sampler
+
+
+def _plot_feature_importance(model: lgb.LGBMClassifier, plot_dir: Path) -> None:
+    """Saves the top-20 feature importance bar chart to plot_dir."""
+    try:
+        # A bare Figure (no pyplot state) is safe to draw off the main thread.
+        fig = Figure(figsize=(10, 8))
+        ax = fig.subplots()
+        lgb.plot_importance(model, ax=ax, max_num_features=20)
+        fig.tight_layout()
+        plot_path = plot_dir / "feature_importance.png"
+        plot_path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(plot_path, dpi=300)
+        log_success(f"Feature importance plot saved to {plot_path}")
+    except Exception as e:
+        log_error(f"Could not generate feature importance plot: {e}")
 
 
 def train_eval_model(
@@ -55,10 +547,8 @@ def train_eval_model(
     perform_cv: bool = False,
 ):
     log_info("--- Starting Model Training for LightGBM ---")
-    max_samples = training_params.get("max_training_samples")
-    if max_samples and len(data) > max_samples:
-        log_info(f"Taking a random sample of {max_samples} for faster optimization...")
-        data = data.sample(n=max_samples, random_state=42)
+    study_name = _study_name(data)
+    data = _sample_training_data(data, training_params)
     if data.empty:
         log_error("Feature DataFrame is empty. Cannot train model.")
         model_path = Path(model_output_path)
@@ -66,76 +556,46 @@ def train_eval_model(
         joblib.dump(None, model_path)
         log_info(f"Empty placeholder model saved to {model_path}.")
         return
-    data.rename(
-        columns=lambda c: c.replace("[", "").replace("]", "").replace("<", ""),
-        inplace=True,
-    )
-    data["tourney_date"] = pd.to_datetime(data["tourney_date"])
-    data = data.sort_values("tourney_date").reset_index(drop=True)
-
-    # Exclude hand columns from being dropped, so they can be one-hot encoded
-    hand_cols = ["p1_hand", "p2_hand"]
-    non_feature_cols = [
-        col
-        for col in data.columns
-        if data[col].dtype == "object" and col not in hand_cols
-    ]
-
-    # FIX: Add the newly identified leaky columns from the feature importance plot
-    identifier_cols = [
-        "winner",
-        "market_id",
-        "p1_id",
-        "p2_id",
-        "tourney_date",
-        "winner_id",
-        "winner_historical_id",
-        "loser_id",
-        "loser_historical_id",
-        "p1_tourney_date",
-        "p2_tourney_date",
-        "p1_won",
-        "p2_won",
-        "p1_winner_id",
-        "p1_loser_id",
-        "p2_winner_id",
-        "p2_loser_id",
-    ]
-    cols_to_drop = list(set(non_feature_cols + identifier_cols))
-
-    X = data.drop(columns=cols_to_drop, errors="ignore")
-    y = data["winner"]
-
-    # Now this step will work correctly as the hand columns are present in X
-    X = pd.get_dummies(X, columns=hand_cols, drop_first=True)
-
-    split_index = int(len(data) * (1 - test_size))
-    X_train_main, y_train_main = X.iloc[:split_index], y.iloc[:split_index]
-    X_test, y_test = X.iloc[split_index:], y.iloc[split_index:]
+    splits = _prepare_splits(data, training_params, test_size)
+    X_train_main, y_train_main = splits.X_train_main, splits.y_train_main
+    X_test, y_test = splits.X_test, splits.y_test
+    # The raw frame is no longer needed once the splits exist; releasing it
+    # (and, below, the tuning Datasets) keeps peak memory to one copy of the data.
+    del data
+    gc.collect()
 
-    validation_size = training_params.get("validation_size", 0.25)
-    val_split_index = int(len(X_train_main) * (1 - validation_size))
-    X_train, y_train = (
-        X_train_main.iloc[:val_split_index],
-        y_train_main.iloc[:val_split_index],
+    study = _create_study(training_params, study_name)
+    _enqueue_previous_best(study, Path(model_output_path).with_suffix(".json"))
+    _run_study(
+        study,
+        splits,
+        training_params,
+        Path(model_output_path).parent / ".cache" / "optuna",
     )
-    X_val, y_val = (
-        X_train_main.iloc[val_split_index:],
-        y_train_main.iloc[val_split_index:],
+    gc.collect()
+    log_info(f"Best trial AUC: {study.best_value:.4f}")
+    best_params = study.best_params
+    # DART tunes its tree count; otherwise it is the early-stopped iteration
+    final_n_estimators = best_params.get(
+        "n_estimators", study.best_trial.user_attrs.get("best_iteration", 100)
     )
-
-    early_stopping_rounds = training_params.get("early_stopping_rounds", 50)
-    study = optuna.create_study(direction="maximize")
-    study.optimize(
-        lambda trial: objective_lgbm(
-            trial, X_train, y_train, X_val, y_val, early_stopping_rounds
-        ),
-        n_trials=training_params["hyperparameter_trials"],
-        show_progress_bar=True,
+    fit_params = {
+        **_runtime_params(os.cpu_count() or 1, _use_gpu(training_params, X_train_main)),
+        **best_params,
+        "n_estimators": final_n_estimators,
+    }
+    # Refit from scratch on the training and validation rows with the tree count
+    # early stopping chose during tuning.
+    final_model = lgb.LGBMClassifier(**fit_params, random_state=42)
+    final_model.fit(
+        X_train_main, y_train_main, categorical_feature=CATEGORICAL_FEATURES
+    )
+    # Render the importance plot in the background while the model is evaluated
+    # and saved; Agg rasterization runs outside the GIL.
+    plot_executor = ThreadPoolExecutor(max_workers=1)
+    plot_future = plot_executor.submit(
+        _plot_feature_importance, final_model, Path(plot_dir)
     )
-    log_info(f"Best trial AUC: {study.best_value:.4f}")
-    final_model = lgb.LGBMClassifier(**study.best_params, random_state=42)
-    final_model.fit(X_train_main, y_train_main)
     y_pred_final = final_model.predict(X_test)
     y_pred_proba_final = final_model.predict_proba(X_test)[:, 1]
 
@@ -152,14 +612,15 @@ def train_eval_model(
 
     model_path = Path(model_output_path)
     model_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(final_model, model_path)
+    joblib.dump(final_model, model_path, compress=MODEL_COMPRESSION, protocol=5)
     log_success(f"Final optimized LGBM model saved to {model_path}")
 
     metrics = {
         "accuracy": accuracy,
         "roc_auc": roc_auc,
         "classification_report": report,
-        "best_params": study.best_params,
+        "best_params": best_params,
+        "final_n_estimators": final_n_estimators,
     }
     metrics_path = model_path.with_suffix(".json")
     with open(metrics_path, "w") as f:
@@ -168,51 +629,137 @@ def train_eval_model(
 
     if perform_cv:
         log_info("\n--- Performing Cross-Validation ---")
-        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-        cv_scores = []
-        for train_idx, val_idx in cv.split(X_train_main, y_train_main):
-            X_train_cv, X_val_cv = (
-                X_train_main.iloc[train_idx],
-                X_train_main.iloc[val_idx],
-            )
-            y_train_cv, y_val_cv = (
-                y_train_main.iloc[train_idx],
-                y_train_main.iloc[val_idx],
-            )
+        n_splits = 5
+        cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        # Folds train concurrently, each on its share of the cores.
+        cpu_count = os.cpu_count() or 1
+        fold_jobs = min(n_splits, cpu_count)
+        cv_params = {
+            **fit_params,
+            "num_threads": max(1, cpu_count // fold_jobs),
+            "objective": "binary",
+            "verbosity": -1,
+            "seed": 42,
+        }
+        cv_rounds = cv_params.pop("n_estimators")
+        # Bin the training rows once; every fold is a subset sharing those bins.
+        X_cv = _to_float32_matrix(X_train_main)
+        dcv = lgb.Dataset(
+            X_cv,
+            label=y_train_main.to_numpy(),
+            feature_name=list(X_train_main.columns),
+            categorical_feature=[
+                c for c in CATEGORICAL_FEATURES if c in X_train_main.columns
+            ],
+            params={
+                "feature_pre_filter": False,
+                "verbosity": -1,
+                "max_bin": fit_params["max_bin"],
+            },
+            free_raw_data=False,
+        ).construct()
+        # Subsets are built up front so the threads only run the boosting loops.
+        folds = [
+            (dcv.subset(train_idx).construct(), val_idx)
+            for train_idx, val_idx in cv.split(X_cv, y_train_main)
+        ]
+
+        def _score_fold(dfold: lgb.Dataset, val_idx: np.ndarray) -> float:
+            booster_cv = lgb.train(cv_params, dfold, num_boost_round=cv_rounds)
+            y_pred_proba_cv = booster_cv.predict(X_cv[val_idx])
+            return float(roc_auc_score(y_train_main.iloc[val_idx], y_pred_proba_cv))
 
-            model_cv = lgb.LGBMClassifier(**study.best_params, random_state=42)
-            model_cv.fit(X_train_cv, y_train_cv)
-            y_pred_proba_cv = model_cv.predict_proba(X_val_cv)[:, 1]
-            cv_scores.append(roc_auc_score(y_val_cv, y_pred_proba_cv))
+        # LightGBM releases the GIL, so threads avoid copying the data to workers.
+        cv_scores = joblib.Parallel(n_jobs=fold_jobs, backend="threading")(
+            joblib.delayed(_score_fold)(dfold, val_idx) for dfold, val_idx in folds
+        )
 
         log_info(f"Cross-validation AUC scores: {[f'{s:.4f}' for s in cv_scores]}")
         log_info(
             f"Mean CV AUC: {pd.Series(cv_scores).mean():.4f} (+/- {pd.Series(cv_scores).std():.4f})"
         )
 
-    try:
-        fig, ax = plt.subplots(figsize=(10, 8))
-        lgb.plot_importance(final_model, ax=ax, max_num_features=20)
-        plt.tight_layout()
-        plot_path = Path(plot_dir) / "feature_importance.png"
-        plot_path.parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(plot_path, dpi=300)
-        log_success(f"Feature importance plot saved to {plot_path}")
-        plt.close(fig)
-    except Exception as e:
-        log_error(f"Could not generate feature importance plot: {e}")
+    plot_future.result()
+    plot_executor.shutdown()
 
 
-def main_cli(config: Config):
-    try:
-        paths, training_params = config.data_paths, config.training_params
-        feature_path = Path(paths.consolidated_features)
+def load_feature_data(feature_path: Path) -> pd.DataFrame:
+    """
+    Loads the feature library, preferring the typed Parquet copy and falling back
+    to a multithreaded, typed read of the CSV. The Parquet copy is only used when
+    it is at least as new as the CSV; otherwise the CSV is read and re-cached, so
+    the text is only parsed once per change.
+    """
+    parquet_path = feature_path.with_suffix(".parquet")
+    if not is_cache_fresh(parquet_path, feature_path):
         if not feature_path.exists():
             raise FileNotFoundError(f"Feature data not found at {feature_path}.")
         log_info(f"Loading feature data from {feature_path}...")
-        feature_data = pd.read_csv(feature_path, low_memory=False)
+        data = pd.read_csv(
+            feature_path,
+            dtype={col: "category" for col in CATEGORICAL_FEATURES},
+            parse_dates=["tourney_date"],
+            engine="pyarrow",
+        )
+        data = to_feature_library_dtypes(data)
+        data.to_parquet(parquet_path, index=False, compression="zstd")
+        log_info(f"Cached feature data as {parquet_path}")
+        # Match the columns a later Parquet read returns.
+        return data.drop(
+            columns=data.select_dtypes(include="object").columns.difference(
+                CATEGORICAL_FEATURES
+            )
+        )
+
+    log_info(f"Loading feature data from {parquet_path}...")
+    # Free-text columns are never model features, so skip reading them at all.
+    schema = pq.read_schema(parquet_path)
+    columns = [
+        field.name
+        for field in schema
+        if field.name in CATEGORICAL_FEATURES
+        or not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type))
+    ]
+    return pd.read_parquet(parquet_path, engine="pyarrow", columns=columns)
+
+
+def run_worker(config: Config) -> None:
+    """
+    Contributes trials to a shared, database-backed study without fitting the
+    final model. Launch any number of these (e.g. with `xargs -P N` or as batch
+    jobs) against the same OPTUNA_STORAGE, then run the `model` command to fit
+    the final model from the best trial found across all workers.
+    """
+    paths, training_params = config.data_paths, config.training_params.dict()
+    if not (os.environ.get("OPTUNA_STORAGE") or training_params.get("optuna_storage")):
+        log_error(
+            "Distributed tuning needs a shared study. Set OPTUNA_STORAGE or "
+            "training_params.optuna_storage to a database URL."
+        )
+        return
+    data = load_feature_data(Path(paths.consolidated_features))
+    study_name = _study_name(data)
+    data = _sample_training_data(data, training_params)
+    if data.empty:
+        log_error("Feature DataFrame is empty. Nothing to tune.")
+        return
+    splits = _prepare_splits(data, training_params, test_size=0.2)
+    del data
+    gc.collect()
+    study = _create_study(training_params, study_name)
+    _enqueue_previous_best(study, Path(paths.model).with_suffix(".json"))
+    _run_study(
+        study, splits, training_params, Path(paths.model).parent / ".cache" / "optuna"
+    )
+    log_success(f"Worker finished. Best AUC so far: {study.best_value:.4f}")
+
+
+def main_cli(config: Config):
+    try:
+        paths, training_params = config.data_paths, config.training_params
+        # Passed without a local reference so training can free it after splitting
         train_eval_model(
-            feature_data,
+            load_feature_data(Path(paths.consolidated_features)),
             model_output_path=paths.model,
             plot_dir=paths.plot_dir,
             training_params=training_params.dict(),
@@ -2,6 +2,9 @@
 import datetime
 import sqlite3
 import logging
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -21,6 +24,20 @@ from ..utils.risk_management import RiskManager
 
 logger = logging.getLogger(__name__)
 
+_CREATE_SELECTIONS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS processed_selections ("
+    "market_id TEXT NOT NULL, selection_id INTEGER NOT NULL, "
+    "PRIMARY KEY (market_id, selection_id)) WITHOUT ROWID"
+)
+
+
+@lru_cache(maxsize=4096)
+def _market_start_epoch(market_time: datetime.datetime) -> float:
+    """Converts a market start time to epoch seconds, treating naive times as UTC."""
+    if market_time.tzinfo is None:
+        market_time = market_time.replace(tzinfo=datetime.timezone.utc)
+    return market_time.timestamp()
+
 
 class TennisValueStrategy(BaseStrategy):
     """
@@ -49,9 +66,17 @@ class TennisValueStrategy(BaseStrategy):
         self.live_kelly_fraction = self.betting_config.live_kelly_fraction
         self.max_kelly_stake_fraction = self.betting_config.max_kelly_stake_fraction
         self.order_timeout_seconds = self.live_trading_config.order_timeout_seconds
+        self._profitable_tournaments = frozenset(
+            self.betting_config.profitable_tournaments
+        )
+        # Competition name -> whether its category is one we trade
+        self._competition_allowed: dict[str, bool] = {}
 
         self.db_path = Path(processed_bets_log_path)
-        self._init_db()
+        self._db_lock = threading.Lock()
+        self._db = self._init_db()
+        # Selections recorded in memory but not yet written to the DB
+        self._pending_selections: list[tuple[str, int]] = []
         self.processed_selections = self._load_processed_selections()
 
         # Initialize the Risk Manager
@@ -65,59 +90,160 @@ class TennisValueStrategy(BaseStrategy):
             f"Loaded {len(self.processed_selections)} processed bets."
         )
 
-    def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "CREATE TABLE IF NOT EXISTS processed_selections (key TEXT PRIMARY KEY)"
-            )
+    def _init_db(self) -> sqlite3.Connection:
+        # One autocommit connection for the strategy's lifetime, so recording a bet
+        # is a single INSERT rather than a connect/commit/close cycle.
+        conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        # WAL turns each insert into a log append instead of a synced rewrite of
+        # the journal; NORMAL sync is still durable across application crashes.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+        self._migrate_legacy_selections(conn)
+        conn.execute(_CREATE_SELECTIONS_TABLE)
+        return conn
+
+    @staticmethod
+    def _migrate_legacy_selections(conn: sqlite3.Connection) -> None:
+        """Splits "<market_id>-<selection_id>" keys from older DBs into two columns."""
+        columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(processed_selections)")
+        }
+        if "key" not in columns:
+            return
+        rows = conn.execute("SELECT key FROM processed_selections").fetchall()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP TABLE processed_selections")
+        conn.execute(_CREATE_SELECTIONS_TABLE)
+        conn.executemany(
+            "INSERT OR IGNORE INTO processed_selections VALUES (?, ?)",
+            [
+                TennisValueStrategy._selection_key(*key.rsplit("-", 1))
+                for (key,) in rows
+            ],
+        )
+        conn.execute("COMMIT")
+        logger.info(f"Migrated {len(rows)} processed selections to the new schema.")
+
+    @staticmethod
+    def _selection_key(market_id: str, selection_id: int) -> tuple[str, int]:
+        return (market_id, int(selection_id))
 
-    def _load_processed_selections(self) -> set:
+    def _load_processed_selections(self) -> set[tuple[str, int]]:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("SELECT key FROM processed_selections")
-                return {row[0] for row in cursor.fetchall()}
+            with self._db_lock:
+                cursor = self._db.execute(
+                    "SELECT market_id, selection_id FROM processed_selections"
+                )
+                return set(cursor.fetchall())
         except sqlite3.Error as e:
             logger.error(f"Error loading processed bets from DB: {e}. Starting fresh.")
             return set()
 
-    def _save_processed_selection(self, selection_key: str):
+    def _save_processed_selection(self, selection_key: tuple[str, int]):
+        # Skipped and dry-run selections carry no money, so their DB write is
+        # deferred to flush_processed_selections and the callback never waits on it.
         self.processed_selections.add(selection_key)
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    "INSERT OR IGNORE INTO processed_selections (key) VALUES (?)",
-                    (selection_key,),
+        with self._db_lock:
+            self._pending_selections.append(selection_key)
+
+    def _save_placed_selection(self, selection_key: tuple[str, int]):
+        """
+        Records a selection with a real order immediately, so a crash before the
+        next flush cannot lose it and let a restart bet the selection again.
+        """
+        self.processed_selections.add(selection_key)
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO processed_selections "
+                    "(market_id, selection_id) VALUES (?, ?)",
+                    selection_key,
                 )
-        except sqlite3.Error as e:
-            logger.error(f"Error saving processed selection to DB: {e}")
+            except sqlite3.Error as e:
+                logger.error(f"Error saving placed selection to DB: {e}")
+                # Fall back to the queue so the next flush retries
+                self._pending_selections.append(selection_key)
+
+    def flush_processed_selections(self) -> None:
+        """Writes pending selections to the DB in a single transaction."""
+        with self._db_lock:
+            if not self._pending_selections:
+                return
+            pending, self._pending_selections = self._pending_selections, []
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO processed_selections "
+                    "(market_id, selection_id) VALUES (?, ?)",
+                    pending,
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.error(f"Error saving processed selections to DB: {e}")
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                # Keep them queued so the next flush retries
+                self._pending_selections[:0] = pending
+
+    def checkpoint_processed_selections(self) -> None:
+        """Checkpoints and truncates the DB's WAL so it cannot grow unbounded."""
+        with self._db_lock:
+            try:
+                busy, log_frames, checkpointed = self._db.execute(
+                    "PRAGMA wal_checkpoint(TRUNCATE)"
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Error checkpointing processed selections DB: {e}")
+                return
+        if busy:
+            logger.warning(
+                f"WAL checkpoint blocked: {checkpointed}/{log_frames} frames "
+                "copied back to the processed selections DB."
+            )
+
+    def finish(self, flumine) -> None:
+        self.flush_processed_selections()
+        with self._db_lock:
+            self._db.close()
 
     def check_market_book(self, market: Market, market_book: MarketBook) -> bool:
-        if (
-            not market.market_catalogue
-            or not market.market_catalogue.competition
-            or not market_book.market_definition
-            or not market.market_catalogue.event
-        ):
+        # Cheapest and most selective guards first: most books are rejected here.
+        if market_book.inplay or market_book.status != "OPEN":
             return False
 
-        if " v " not in market.market_catalogue.event.name:
+        catalogue = market.market_catalogue
+        market_definition = market_book.market_definition
+        if (
+            not catalogue
+            or not catalogue.competition
+            or not catalogue.event
+            or not market_definition
+        ):
             return False
 
-        if market_book.status != "OPEN" or market_book.inplay:
+        if " v " not in catalogue.event.name:
             return False
 
-        if self.betting_config.profitable_tournaments:
-            competition_name = getattr(market.market_catalogue.competition, "name", "")
-            tournament_category = get_tournament_category(competition_name)
-            if tournament_category not in self.betting_config.profitable_tournaments:
+        if self._profitable_tournaments:
+            competition_name = catalogue.competition.name or ""
+            allowed = self._competition_allowed.get(competition_name)
+            if allowed is None:
+                allowed = (
+                    get_tournament_category(competition_name)
+                    in self._profitable_tournaments
+                )
+                self._competition_allowed[competition_name] = allowed
+            if not allowed:
                 return False
 
-        now = datetime.datetime.now(datetime.timezone.utc)
-        start_time = market_book.market_definition.market_time
-        if start_time.tzinfo is None:
-            start_time = start_time.replace(tzinfo=datetime.timezone.utc)
-
-        seconds_to_start = (start_time - now).total_seconds()
+        seconds_to_start = (
+            _market_start_epoch(market_definition.market_time) - time.time()
+        )
 
         return bool(60 < seconds_to_start < 3600)
 
@@ -143,25 +269,41 @@ class TennisValueStrategy(BaseStrategy):
             )
             return
 
+        market_id = market.market_id
+        # Loop-invariant lookups bound once per call
+        processed = self.processed_selections
+        save_selection = self._save_processed_selection
+        live_kelly_fraction = self.live_kelly_fraction
+        max_kelly_stake_fraction = self.max_kelly_stake_fraction
+        dry_run = self.dry_run
+        # Only selections this strategy already has orders on can carry exposure,
+        # so the blotter's exposure calculation is skipped for everything else.
+        selections_with_orders = {
+            order.selection_id for order in market.blotter.strategy_orders(self)
+        }
         for bet in value_bets:
-            selection_key = f"{market.market_id}-{bet['selection_id']}"
-            if selection_key in self.processed_selections:
+            selection_key = self._selection_key(market_id, bet["selection_id"])
+            if selection_key in processed:
                 continue
 
-            current_exposure = market.blotter.selection_exposure(
-                self, (market.market_id, bet["selection_id"], 0)
+            current_exposure = (
+                market.blotter.selection_exposure(
+                    self, (market_id, bet["selection_id"], 0)
+                )
+                if bet["selection_id"] in selections_with_orders
+                else 0.0
             )
             if current_exposure != 0:
                 continue
 
             log_success(
-                f"VALUE BET FOUND: {bet['player_name']} @ {bet['odds']} (EV: {bet['ev']})"
+                f"VALUE BET FOUND: {bet['player_name']} @ {bet['odds']} (EV: {bet['ev']:+.2%})"
             )
 
             kelly_fraction = float(bet.get("kelly_fraction", 0.0))
-            desired_kelly_fraction = kelly_fraction * self.live_kelly_fraction
+            desired_kelly_fraction = kelly_fraction * live_kelly_fraction
             capped_kelly_fraction = min(
-                desired_kelly_fraction, self.max_kelly_stake_fraction
+                desired_kelly_fraction, max_kelly_stake_fraction
             )
             stake = live_bankroll * capped_kelly_fraction
 
@@ -173,18 +315,18 @@ class TennisValueStrategy(BaseStrategy):
                 log_warning(
                     f"Stake {stake:.2f} is below minimum for {bet['player_name']}, not placing bet."
                 )
-                self._save_processed_selection(selection_key)
+                save_selection(selection_key)
                 continue
 
-            if self.dry_run:
+            if dry_run:
                 log_info(
                     f"[DRY RUN] Would place bet: {bet['player_name']} @ {bet['odds']} with stake ${stake:.2f}"
                 )
-                self._save_processed_selection(selection_key)
+                save_selection(selection_key)
                 continue
 
             trade = Trade(
-                market_id=market.market_id,
+                market_id=market_id,
                 selection_id=bet["selection_id"],
                 handicap=0,
                 strategy=self,
@@ -196,7 +338,7 @@ class TennisValueStrategy(BaseStrategy):
                 ),
             )
             market.place_order(order)
-            self._save_processed_selection(selection_key)
+            self._save_placed_selection(selection_key)
 
     def process_orders(self, market: Market, orders: list):
         for order in orders:
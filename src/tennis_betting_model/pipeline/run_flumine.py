@@ -1,5 +1,6 @@
 # FILE: src/tennis_betting_model/pipeline/run_flumine.py
 import datetime
+import heapq
 import joblib
 import logging
 from typing import List, Set
@@ -13,7 +14,7 @@ from flumine.worker import BackgroundWorker
 
 from ..builders.feature_builder import FeatureBuilder
 from ..pipeline.flumine_strategy import TennisValueStrategy
-from ..pipeline.value_finder import MarketProcessor
+from ..pipeline.value_finder import MarketProcessor, warm_up_value_check
 from ..utils.api import login_to_betfair
 from ..utils.config_schema import Config
 from ..utils.data_loader import DataLoader
@@ -23,6 +24,21 @@ from ..utils.constants import BETFAIR_TENNIS_EVENT_TYPE_ID
 logger = logging.getLogger(__name__)
 
 
+def build_poll_filter(poll_hours_ahead: float) -> dict:
+    """Builds the catalogue filter for match odds markets starting from now."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    end_time = now + datetime.timedelta(hours=poll_hours_ahead)
+    poll_filter: dict = betfairlightweight.filters.market_filter(
+        event_type_ids=[BETFAIR_TENNIS_EVENT_TYPE_ID],
+        market_type_codes=["MATCH_ODDS"],
+        market_start_time={
+            "from": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "to": end_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+    )
+    return poll_filter
+
+
 def fetch_and_limit_market_ids(
     client: betfairlightweight.APIClient, poll_filter: dict, limit: int
 ) -> Set[str]:
@@ -46,35 +62,51 @@ def fetch_and_limit_market_ids(
         for m in market_catalogues
         if hasattr(m, "market_start_time") and m.market_start_time
     ]
-    if valid_markets:
-        try:
-            valid_markets.sort(key=lambda x: x.market_start_time)
-        except TypeError:
-            logger.warning("Could not sort markets due to unexpected start time types.")
-    target_ids = set(m.market_id for m in valid_markets[:limit])
+    # Only the earliest `limit` markets are needed, so avoid a full sort
+    try:
+        soonest = heapq.nsmallest(
+            limit, valid_markets, key=lambda x: x.market_start_time
+        )
+    except TypeError:
+        logger.warning("Could not sort markets due to unexpected start time types.")
+        soonest = valid_markets[:limit]
+    target_ids = {m.market_id for m in soonest}
     logger.info(
         f"Identified {len(target_ids)} markets (out of {len(valid_markets)} found) for subscription."
     )
     return target_ids
 
 
+def flush_processed_selections(context: dict, flumine):
+    strategy = context.get("strategy")
+    if strategy is not None:
+        strategy.flush_processed_selections()
+
+
+def checkpoint_processed_selections(context: dict, flumine):
+    strategy = context.get("strategy")
+    if strategy is not None:
+        strategy.checkpoint_processed_selections()
+
+
 def poll_markets(context: dict, flumine):
     logger.info("Worker: Starting market poll cycle...")
     lightweight_client = context.get("lightweight_client")
-    poll_filter = context.get("poll_filter")
+    poll_hours_ahead = context.get("poll_hours_ahead")
     strategy = context.get("strategy")
     stream_limit = context.get("stream_limit")
 
-    if not all([lightweight_client, poll_filter, strategy, stream_limit]):
+    if not all([lightweight_client, poll_hours_ahead, strategy, stream_limit]):
         logger.error("Worker: Missing required objects in context.")
         return
 
-    assert poll_filter is not None
+    assert poll_hours_ahead is not None
     assert strategy is not None
     assert stream_limit is not None
 
+    # Rebuilt each cycle so the start-time window moves with the clock
     target_market_ids = fetch_and_limit_market_ids(
-        lightweight_client, poll_filter, stream_limit
+        lightweight_client, build_poll_filter(poll_hours_ahead), stream_limit
     )
     old_stream = next((s for s in flumine.streams if isinstance(s, MarketStream)), None)
     if not old_stream:
@@ -139,20 +171,10 @@ def main(config: Config, dry_run: bool):
 
     poll_hours_ahead = config.live_trading_params.poll_hours_ahead
     stream_limit = config.live_trading_params.stream_limit
-    now = datetime.datetime.utcnow()
-    end_time = now + datetime.timedelta(hours=poll_hours_ahead)
-    poll_filter = betfairlightweight.filters.market_filter(
-        event_type_ids=[BETFAIR_TENNIS_EVENT_TYPE_ID],
-        market_type_codes=["MATCH_ODDS"],
-        market_start_time={
-            "from": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "to": end_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        },
-    )
 
     log_info("Pre-polling markets to determine initial subscription list...")
     initial_market_ids = fetch_and_limit_market_ids(
-        lightweight_client, poll_filter, stream_limit
+        lightweight_client, build_poll_filter(poll_hours_ahead), stream_limit
     )
 
     log_info("Loading ML Model and supporting data...")
@@ -175,6 +197,8 @@ def main(config: Config, dry_run: bool):
             player_info_lookup, df_rankings, df_matches, df_elo, config.elo_config
         )
         market_processor = MarketProcessor(model, feature_builder, config.betting)
+        # Compile the value check now rather than on the first market book
+        warm_up_value_check()
     except Exception as e:
         log_error(
             f"Error loading pipeline data or initializing components: {e}. Exiting."
@@ -202,7 +226,7 @@ def main(config: Config, dry_run: bool):
     framework.add_strategy(strategy)
     worker_context = {
         "lightweight_client": lightweight_client,
-        "poll_filter": poll_filter,
+        "poll_hours_ahead": poll_hours_ahead,
         "strategy": strategy,
         "stream_limit": stream_limit,
     }
@@ -216,6 +240,25 @@ def main(config: Config, dry_run: bool):
             context=worker_context,
         )
     )
+    framework.add_worker(
+        BackgroundWorker(
+            flumine=framework,
+            function=flush_processed_selections,
+            interval=5,
+            name="flush_processed_selections",
+            context=worker_context,
+        )
+    )
+    framework.add_worker(
+        BackgroundWorker(
+            flumine=framework,
+            function=checkpoint_processed_selections,
+            interval=600,
+            start_delay=600,
+            name="checkpoint_processed_selections",
+            context=worker_context,
+        )
+    )
     log_info(
         f"Starting Flumine framework. Worker active. Polling every 5 minutes for markets in the next {poll_hours_ahead} hours."
     )
@@ -223,5 +266,6 @@ def main(config: Config, dry_run: bool):
         framework.run()
     except KeyboardInterrupt:
         log_info("Keyboard interrupt received, shutting down...")
+        strategy.flush_processed_selections()
     except Exception as e:
         log_error(f"Flumine framework encountered a runtime error: {e}", exc_info=True)
@@ -1,22 +1,102 @@
 # src/scripts/pipeline/simulate_bankroll_growth.py
 
+import numpy as np
 import pandas as pd
+from numba import njit
 from typing import Dict
 
 from tennis_betting_model.utils.logger import log_info, log_warning
 from tennis_betting_model.utils.common import (
     normalize_df_column_names,
     patch_winner_column,
+    sort_by_date,
 )
 
+# Columns read by simulate_bankroll_growth; callers can project onto these.
+SIMULATION_COLUMNS = ["tourney_date", "odds", "winner", "kelly_fraction"]
+
+# Integer codes let the compiled kernel branch on the staking strategy.
+STRATEGY_CODES = {"kelly": 0, "flat": 1, "percent": 2}
+
+
+@njit(cache=True)
+def _simulate_kernel(
+    odds: np.ndarray,
+    kelly: np.ndarray,
+    won: np.ndarray,
+    initial_bankroll: float,
+    strategy_id: int,
+    stake_unit: float,
+    kelly_fraction: float,
+    max_kelly_stake_fraction: float,
+    max_stake_cap: float,
+    max_profit_per_bet: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compiled per-bet bankroll update. Comparisons are written out explicitly so
+    that NaN inputs produce a zero stake rather than propagating.
+    """
+    n = odds.shape[0]
+    stakes = np.zeros(n)
+    profits = np.zeros(n)
+    bankrolls = np.empty(n)
+    bankroll = initial_bankroll
+
+    for i in range(n):
+        stake = 0.0
+        if not np.isnan(odds[i]):
+            if strategy_id == 0:
+                frac = kelly[i] * kelly_fraction
+                if frac > max_kelly_stake_fraction:
+                    frac = max_kelly_stake_fraction
+                stake = bankroll * frac
+            elif strategy_id == 1:
+                stake = stake_unit
+            elif strategy_id == 2:
+                stake = bankroll * (stake_unit / 100.0)
+
+            # Enforce the max stake cap and never stake more than the bankroll
+            if stake > bankroll * max_stake_cap:
+                stake = bankroll * max_stake_cap
+            if stake > bankroll:
+                stake = bankroll
+            if not stake > 0.0:
+                stake = 0.0
+
+        if won[i] == 1:
+            profit = stake * (odds[i] - 1.0) if stake > 0.0 else 0.0
+            if profit > max_profit_per_bet:
+                profit = max_profit_per_bet
+        else:
+            profit = -stake
+
+        bankroll += profit
+        stakes[i] = stake
+        profits[i] = profit
+        bankrolls[i] = bankroll
+
+    return stakes, profits, bankrolls
+
+
+def warm_up_simulation() -> None:
+    """Triggers (or loads from the on-disk cache) the kernel compilation."""
+    one = np.ones(1)
+    _simulate_kernel(
+        one, one, np.ones(1, dtype=np.int64), 1.0, 0, 1.0, 1.0, 1.0, 1.0, 1.0
+    )
+
 
 def calculate_max_drawdown(bankroll_series: pd.Series) -> tuple[float, float]:
     """Calculates the maximum drawdown and the peak bankroll."""
-    peak = bankroll_series.expanding(min_periods=1).max()
-    drawdown = (bankroll_series - peak) / peak
-    max_drawdown = drawdown.min()
-    peak_bankroll = peak.max()
-    return peak_bankroll, max_drawdown if pd.notna(max_drawdown) else 0.0
+    bankroll = bankroll_series.to_numpy(dtype=np.float64)
+    if not (~np.isnan(bankroll)).any():
+        return np.nan, 0.0
+    # fmax skips NaNs, matching an expanding max over the series
+    peak = np.fmax.accumulate(bankroll)
+    max_drawdown = np.nanmin((bankroll - peak) / peak)
+    return float(np.nanmax(peak)), (
+        float(max_drawdown) if not np.isnan(max_drawdown) else 0.0
+    )
 
 
 def simulate_bankroll_growth(
@@ -46,54 +126,32 @@ def simulate_bankroll_growth(
         df["tourney_date"] = pd.to_datetime(df["tourney_date"], errors="coerce")
 
     df.dropna(subset=["tourney_date"], inplace=True)
-    df = df.sort_values(by="tourney_date").reset_index(drop=True)
-
-    bankroll = float(initial_bankroll)
-    stakes = []
-    profits = []
-    bankroll_history = []
-
-    for _, row in df.iterrows():
-        profit = 0.0
-        current_stake = 0.0
-
-        try:
-            row_kelly_fraction = float(row.get("kelly_fraction", 0.0))
-            row_odds = float(row.get("odds", 1.0))
-            row_winner = int(row.get("winner", 0))
-
-            if strategy == "kelly":
-                kelly_frac = row_kelly_fraction * float(kelly_fraction)
-                kelly_frac = min(kelly_frac, max_kelly_stake_fraction)
-                current_stake = bankroll * kelly_frac
-            elif strategy == "flat":
-                current_stake = float(stake_unit)
-            elif strategy == "percent":
-                current_stake = bankroll * (float(stake_unit) / 100.0)
-
-            # Enforce the new max stake cap
-            max_allowed_stake = bankroll * max_stake_cap
-            current_stake = min(current_stake, max_allowed_stake)
-            current_stake = max(0.0, min(current_stake, bankroll))
-
-            if row_winner == 1:
-                profit = current_stake * (row_odds - 1.0)
-                profit = min(profit, max_profit_per_bet)
-            else:
-                profit = -current_stake
-
-        except (ValueError, TypeError) as e:
-            log_warning(
-                f"Skipping a row in simulation due to data error: {e}. Row: {row.to_dict()}"
-            )
-            profit = 0.0
-            current_stake = 0.0
-
-        bankroll += profit
-
-        stakes.append(current_stake)
-        profits.append(profit)
-        bankroll_history.append(bankroll)
+    # Bet logs usually arrive in date order already; only unsorted ones are reordered
+    df = sort_by_date(df)
+
+    def _numeric_column(name: str, default: float) -> np.ndarray:
+        if name not in df.columns:
+            return np.full(len(df), default)
+        return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+
+    odds = _numeric_column("odds", 1.0)
+    kelly = _numeric_column("kelly_fraction", 0.0)
+    invalid = int(np.isnan(odds).sum())
+    if invalid:
+        log_warning(f"Skipping {invalid} bets in simulation with missing or bad odds.")
+
+    stakes, profits, bankroll_history = _simulate_kernel(
+        odds,
+        kelly,
+        df["winner"].to_numpy(dtype=np.int64),
+        float(initial_bankroll),
+        STRATEGY_CODES.get(strategy, -1),
+        float(stake_unit),
+        float(kelly_fraction),
+        float(max_kelly_stake_fraction),
+        float(max_stake_cap),
+        float(max_profit_per_bet),
+    )
 
     df["stake"] = stakes
     df["profit"] = profits
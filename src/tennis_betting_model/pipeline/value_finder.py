@@ -1,18 +1,60 @@
 # FILE: src/tennis_betting_model/pipeline/value_finder.py
 
+import re
+import sys
+
+import lightgbm as lgb
+import numpy as np
 import pandas as pd
-from decimal import Decimal
-from typing import cast, Dict, Any
+from numba import njit
+from typing import cast, Dict, Any, Iterable, Tuple
 
 from ..utils.logger import log_warning
 from ..builders.feature_builder import FeatureBuilder
 from ..utils.config_schema import Betting
+from ..utils.constants import CATEGORICAL_FEATURES
+
+# A live session sees at most a few thousand markets; beyond this the cache resets
+MATCH_LABEL_CACHE_SIZE = 4096
+
+# Surface keywords in a market name, matched in a single case-insensitive scan
+_SURFACE_PATTERN = re.compile(r"clay|grass", re.IGNORECASE)
+
+
+@njit(cache=True)
+def _value_kernel(
+    win_probs: np.ndarray, odds: np.ndarray, ev_threshold: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compiled EV/Kelly check over (market, runner) cells. Comparisons are written
+    so that NaN odds (no prices) never qualify.
+    """
+    n_markets, n_runners = odds.shape
+    is_value = np.zeros((n_markets, n_runners), dtype=np.bool_)
+    ev = np.empty((n_markets, n_runners))
+    kelly = np.zeros((n_markets, n_runners))
+
+    for i in range(n_markets):
+        for j in range(n_runners):
+            ev[i, j] = win_probs[i, j] * odds[i, j] - 1.0
+            if ev[i, j] > ev_threshold:
+                is_value[i, j] = True
+                if odds[i, j] > 1.0:
+                    kelly[i, j] = ev[i, j] / (odds[i, j] - 1.0)
+
+    return is_value, ev, kelly
+
+
+def warm_up_value_check() -> None:
+    """Triggers (or loads from the on-disk cache) the kernel compilation."""
+    one = np.ones((1, 2))
+    _value_kernel(one, one, 0.0)
 
 
 class MarketProcessor:
     """
-    Encapsulates all logic for processing a single live betting market
-    to find value bets. It relies on injected dependencies for feature building
+    Encapsulates all logic for processing live betting markets to find
+    value bets. It relies on injected dependencies for feature building
     and model predictions.
     """
 
@@ -21,88 +63,220 @@ class MarketProcessor:
     ):
         self.model = model
         self.feature_builder = feature_builder
-        # Use Decimal for precise financial calculations from a typed config object
-        self.ev_threshold = Decimal(str(betting_config.ev_threshold))
+        self.ev_threshold = float(betting_config.ev_threshold)
+        # The model's column layout is fixed, so resolve it once
+        self._feature_columns = list(self.model.feature_names_in_)
+        self._categorical_dtypes = {
+            c: "category" for c in CATEGORICAL_FEATURES if c in self._feature_columns
+        }
+        # A fitted LightGBM classifier is scored through its booster directly,
+        # skipping the sklearn wrapper's per-call parameter processing
+        self._booster = (
+            model.booster_ if isinstance(model, lgb.LGBMClassifier) else None
+        )
+        # With the categories the booster saw at fit time, categorical values can
+        # be encoded here and the model fed a plain float array, bypassing pandas
+        self._category_codes = self._booster_category_codes()
+        # Market id -> "competition - event" label, reused across polls
+        self._match_labels: dict[str, str] = {}
 
-    def _check_player_for_value(
-        self, market_catalogue, runner_meta, runner_book, win_prob
-    ) -> dict | None:
-        """Checks a single player/runner for a value bet."""
-        if runner_book.ex.available_to_back:
-            odds = Decimal(str(runner_book.ex.available_to_back[0]["price"]))
-            ev = (win_prob * odds) - Decimal("1.0")
-            if ev > self.ev_threshold:
-                kelly_denominator = odds - Decimal("1.0")
-                kelly = (
-                    (ev / kelly_denominator)
-                    if kelly_denominator > 0
-                    else Decimal("0.0")
-                )
-                return self._create_bet_info(
-                    market_catalogue,
-                    runner_meta,
-                    odds,
-                    win_prob,
-                    ev,
-                    kelly,
-                )
-        return None
+    def _booster_category_codes(self) -> dict[str, dict] | None:
+        """
+        Maps each categorical feature's values to the codes LightGBM assigned at
+        fit time, or returns None when the model is not a LightGBM classifier.
+        Raises ValueError if the model's categoricals are not exactly the
+        CATEGORICAL_FEATURES it is given, since no market could be scored.
+        """
+        if self._booster is None:
+            return None
+        # LightGBM stores one category list per categorical column, in column order
+        categorical = [c for c in self._feature_columns if c in CATEGORICAL_FEATURES]
+        pandas_categorical = self._booster.pandas_categorical or []
+        if len(pandas_categorical) != len(categorical):
+            raise ValueError(
+                f"Model has {len(pandas_categorical)} categorical features but "
+                f"{len(categorical)} of its columns are in CATEGORICAL_FEATURES "
+                f"({', '.join(categorical)}). Retrain the model."
+            )
+        return {
+            column: {value: float(code) for code, value in enumerate(categories)}
+            for column, categories in zip(categorical, pandas_categorical)
+        }
+
+    def _features_to_array(self, feature_rows: list[dict]) -> np.ndarray:
+        """Lays feature dicts out in model column order as a float matrix."""
+        codes = cast(Dict[str, dict], self._category_codes)
+        return np.array(
+            [
+                [
+                    (
+                        codes[column].get(row.get(column), np.nan)
+                        if column in codes
+                        else row.get(column, 0)
+                    )
+                    for column in self._feature_columns
+                ]
+                for row in feature_rows
+            ],
+            dtype=np.float64,
+        )
+
+    @staticmethod
+    def _best_back_price(runner_book) -> float:
+        """Returns the runner's best available back price, or NaN if none."""
+        available = runner_book.ex.available_to_back
+        return float(available[0]["price"]) if available else np.nan
 
     def process_market(self, market_catalogue, market_book) -> list:
         """
         Analyzes a single market and returns any identified value bets.
         """
-        if (
-            not market_book
-            or not hasattr(market_catalogue, "runners")
-            or not hasattr(market_book, "runners")
-            or len(market_catalogue.runners) != 2
-            or len(market_book.runners) != 2
-        ):
+        return self.process_markets([(market_catalogue, market_book)])
+
+    def process_markets(self, markets: Iterable[Tuple[Any, Any]]) -> list:
+        """
+        Analyzes (market_catalogue, market_book) pairs and returns any identified
+        value bets, scoring every valid market with a single model call.
+        """
+        # A win probability can't exceed 1, so a runner needs odds above this for
+        # any prediction to clear the EV threshold
+        min_odds = 1.0 + self.ev_threshold
+        paired = []
+        for market_catalogue, market_book in markets:
+            try:
+                runners = self._pair_runners(market_catalogue, market_book)
+                if runners is None:
+                    continue
+                prices = [self._best_back_price(book) for _, book in runners]
+            except Exception as e:
+                self._log_skipped_market(market_catalogue, e)
+                continue
+            # Skip features and prediction when neither runner could be value
+            if any(price > min_odds for price in prices):
+                paired.append((market_catalogue, runners, prices))
+
+        if not paired:
             return []
 
-        try:
-            p1_meta, p2_meta = market_catalogue.runners
-            book_runners_dict = {r.selection_id: r for r in market_book.runners}
-            p1_book = book_runners_dict.get(p1_meta.selection_id)
-            p2_book = book_runners_dict.get(p2_meta.selection_id)
+        # Parse every start time in one pass rather than once per market
+        match_dates = pd.to_datetime(
+            pd.Series(
+                [
+                    getattr(market_catalogue, "market_start_time", None)
+                    for market_catalogue, _, _ in paired
+                ],
+                dtype=object,
+            ),
+            utc=True,
+            errors="coerce",
+        )
+
+        catalogues = [market_catalogue for market_catalogue, _, _ in paired]
+        built = list(map(self._try_build_features, catalogues, match_dates))
 
-            if not p1_book or not p2_book:
-                return []
+        candidates = []
+        feature_rows = []
+        for market, features in zip(paired, built):
+            if features is not None:
+                candidates.append(market)
+                feature_rows.append(features)
 
-            features = self._build_live_features(market_catalogue)
-            if features is None:
-                return []
+        if not feature_rows:
+            return []
 
-            features_df = pd.DataFrame([features])
-            features_df = features_df.reindex(
-                columns=self.model.feature_names_in_, fill_value=0
+        try:
+            if self._booster is not None and self._category_codes is not None:
+                # Binary objective: the booster returns P(P1 wins) per row
+                p1_probs = np.asarray(
+                    self._booster.predict(self._features_to_array(feature_rows)),
+                    dtype=np.float64,
+                )
+            else:
+                # Built column by column in model order, so no reindex copy is needed
+                features_df = pd.DataFrame(
+                    {
+                        column: [row.get(column, 0) for row in feature_rows]
+                        for column in self._feature_columns
+                    }
+                ).astype(self._categorical_dtypes)
+                p1_probs = np.asarray(
+                    self.model.predict_proba(features_df), dtype=np.float64
+                )[:, 1]
+        except Exception as e:
+            log_warning(
+                f"Skipping {len(feature_rows)} markets due to prediction error: {e}"
             )
+            return []
 
-            prediction = self.model.predict_proba(features_df)[0]
-            win_prob_p1 = Decimal(str(prediction[1]))
-            win_prob_p2 = Decimal("1.0") - win_prob_p1
+        # One row per market, one column per runner (P1, P2)
+        win_probs = np.column_stack([p1_probs, 1.0 - p1_probs])
+        odds = np.array([prices for _, _, prices in candidates], dtype=np.float64)
+        is_value, ev, kelly = _value_kernel(win_probs, odds, self.ev_threshold)
 
-            value_bets = []
-            p1_bet = self._check_player_for_value(
-                market_catalogue, p1_meta, p1_book, win_prob_p1
+        value_bets = []
+        for i, j in zip(*np.nonzero(is_value)):
+            market_catalogue, runners, _ = candidates[i]
+            value_bets.append(
+                self._create_bet_info(
+                    market_catalogue,
+                    runners[j][0],
+                    odds[i, j],
+                    win_probs[i, j],
+                    ev[i, j],
+                    kelly[i, j],
+                )
             )
-            if p1_bet:
-                value_bets.append(p1_bet)
+        return value_bets
 
-            p2_bet = self._check_player_for_value(
-                market_catalogue, p2_meta, p2_book, win_prob_p2
-            )
-            if p2_bet:
-                value_bets.append(p2_bet)
+    @staticmethod
+    def _log_skipped_market(market_catalogue, error: Exception) -> None:
+        market_id = getattr(market_catalogue, "market_id", "UnknownID")
+        log_warning(f"Skipping market {market_id} due to processing error: {error}")
 
-            return value_bets
+    def _pair_runners(self, market_catalogue, market_book) -> tuple | None:
+        """
+        Pairs each runner's catalogue metadata with its book, or returns None if
+        the market isn't a priced two-runner market.
+        """
+        try:
+            catalogue_runners = market_catalogue.runners
+            book_runners = market_book.runners  # Also covers a missing (None) book
+        except AttributeError:
+            return None
+        if len(catalogue_runners) != 2 or len(book_runners) != 2:
+            return None
+
+        p1_meta, p2_meta = catalogue_runners
+        p1_book, p2_book = book_runners
+        # Books usually list runners in catalogue order; only match by id if not
+        if (
+            p1_book.selection_id != p1_meta.selection_id
+            or p2_book.selection_id != p2_meta.selection_id
+        ):
+            book_runners_dict = {r.selection_id: r for r in book_runners}
+            p1_book = book_runners_dict.get(p1_meta.selection_id)
+            p2_book = book_runners_dict.get(p2_meta.selection_id)
+
+        if not p1_book or not p2_book:
+            return None
+
+        return (p1_meta, p1_book), (p2_meta, p2_book)
+
+    def _try_build_features(
+        self, market_catalogue, match_date: pd.Timestamp
+    ) -> dict | None:
+        """Builds a market's features, logging and skipping it on failure."""
+        try:
+            if pd.isna(match_date):
+                raise ValueError("market start time is missing or invalid")
+            return self._build_live_features(market_catalogue, match_date)
         except Exception as e:
-            market_id = getattr(market_catalogue, "market_id", "UnknownID")
-            log_warning(f"Skipping market {market_id} due to processing error: {e}")
-            return []
+            self._log_skipped_market(market_catalogue, e)
+            return None
 
-    def _build_live_features(self, market_catalogue) -> dict | None:
+    def _build_live_features(
+        self, market_catalogue, match_date: pd.Timestamp
+    ) -> dict | None:
         """Builds features for a live market using the injected feature_builder."""
         p1_meta, p2_meta = market_catalogue.runners
         try:
@@ -111,37 +285,47 @@ class MarketProcessor:
             return None
 
         surface = "Hard"
-        if hasattr(market_catalogue, "market_name") and market_catalogue.market_name:
-            name_lower = market_catalogue.market_name.lower()
-            if "clay" in name_lower:
-                surface = "Clay"
-            elif "grass" in name_lower:
-                surface = "Grass"
-
-        match_date = pd.to_datetime(market_catalogue.market_start_time, utc=True)
+        market_name = getattr(market_catalogue, "market_name", None)
+        if market_name:
+            match = _SURFACE_PATTERN.search(market_name)
+            if match:
+                surface = match.group(0).capitalize()
 
         features = self.feature_builder.build_features(
             p1_id, p2_id, surface, match_date, match_id=market_catalogue.market_id
         )
         return cast(Dict[str, Any], features)
 
+    def _match_label(self, market) -> str:
+        """Returns the "competition - event" label, built once per market."""
+        label = self._match_labels.get(market.market_id)
+        if label is None:
+            comp_name = (
+                getattr(market.competition, "name", "N/A")
+                if hasattr(market, "competition")
+                else "N/A"
+            )
+            event_name = (
+                getattr(market.event, "name", "N/A")
+                if hasattr(market, "event")
+                else "N/A"
+            )
+            if len(self._match_labels) >= MATCH_LABEL_CACHE_SIZE:
+                self._match_labels.clear()
+            label = sys.intern(f"{comp_name} - {event_name}")
+            self._match_labels[market.market_id] = label
+        return label
+
     def _create_bet_info(self, market, runner_meta, odds, prob, ev, kelly) -> dict:
         """Creates a formatted dictionary for an identified value bet."""
-        comp_name = (
-            getattr(market.competition, "name", "N/A")
-            if hasattr(market, "competition")
-            else "N/A"
-        )
-        event_name = (
-            getattr(market.event, "name", "N/A") if hasattr(market, "event") else "N/A"
-        )
         return {
             "market_id": market.market_id,
             "selection_id": runner_meta.selection_id,
-            "match": f"{comp_name} - {event_name}",
+            "match": self._match_label(market),
             "player_name": runner_meta.runner_name,
             "odds": float(odds),
-            "model_prob": f"{prob:.2%}",
-            "ev": f"{ev:+.2%}",
+            # Kept numeric; formatted as percentages only when displayed
+            "model_prob": float(prob),
+            "ev": float(ev),
             "kelly_fraction": float(kelly) if kelly > 0 else 0.0,
         }
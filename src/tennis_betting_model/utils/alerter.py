@@ -27,6 +27,11 @@ def _send_telegram_message(message: str, parse_mode: str = "Markdown") -> None:
 
 def alert_value_bets_found(bet_df: pd.DataFrame) -> None:
     """Formats and sends an alert for newly identified value bets."""
+    bet_df = bet_df.copy()
+    if "model_prob" in bet_df:
+        bet_df["model_prob"] = bet_df["model_prob"].map("{:.2%}".format)
+    if "ev" in bet_df:
+        bet_df["ev"] = bet_df["ev"].map("{:+.2%}".format)
     header = "🚀 ALERT: New Value Bets Found! 🚀"
     message = f"{header}\n\n```\n{bet_df.to_string(index=False)}\n```"
     print(
@@ -1,5 +1,43 @@
 import numpy as np
 import pandas as pd
+from numba import njit
+
+
+@njit(cache=True, error_model="numpy")
+def _ev_kelly_kernel(
+    probs: np.ndarray, odds: np.ndarray, commission: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compiled single pass over the rows. Division follows IEEE rules like the
+    pandas arithmetic it replaces, and NaN inputs propagate rather than being
+    turned into a stake.
+    """
+    n = probs.shape[0]
+    ev = np.empty(n)
+    kelly = np.empty(n)
+
+    for i in range(n):
+        p = probs[i]
+        b = odds[i] - 1.0
+        # Expected Value is a pre-commission measure of value
+        ev[i] = p * b - (1.0 - p)
+
+        # Odds of 1.0 or less (or missing) can never be staked
+        if not odds[i] > 1.0:
+            kelly[i] = 0.0
+            continue
+
+        if commission > 0:
+            # Commission-adjusted Kelly uses the net odds after commission:
+            # Kelly % = prob - ( (1 - prob) / ( (odds - 1) * (1 - commission) ) )
+            k = p - (1.0 - p) / (b * (1.0 - commission))
+        else:
+            k = ev[i] / b
+
+        # A negative Kelly fraction means no bet
+        kelly[i] = 0.0 if k < 0.0 else k
+
+    return ev, kelly
 
 
 def add_ev_and_kelly(
@@ -16,25 +54,13 @@ def add_ev_and_kelly(
     if not inplace:
         df = df.copy()
 
-    # Expected Value remains the same (it's a pre-commission measure of value)
-    df["expected_value"] = (df[prob_col] * (df[odds_col] - 1)) - (1 - df[prob_col])
-
-    # Calculate Kelly Criterion with commission adjustment
-    if commission > 0:
-        # The formula for commission-adjusted Kelly is:
-        # Kelly % = prob - ( (1 - prob) / ( (odds - 1) * (1 - commission) ) )
-        # This correctly uses the net odds available after commission.
-        kelly_denominator = (df[odds_col] - 1) * (1 - commission)
-        df["kelly_fraction"] = df[prob_col] - ((1 - df[prob_col]) / kelly_denominator)
-    else:
-        # Original calculation if no commission is applied
-        kelly_denominator = df[odds_col] - 1
-        kelly_numerator = (df[prob_col] * kelly_denominator) - (1 - df[prob_col])
-        df["kelly_fraction"] = kelly_numerator / kelly_denominator
-
-    # Ensure Kelly is not negative (no bet) and handle cases where odds are 1.0 (denominator is zero)
-    df["kelly_fraction"] = np.where(df[odds_col] > 1, df["kelly_fraction"], 0)
-    df["kelly_fraction"] = df["kelly_fraction"].clip(lower=0)
+    ev, kelly = _ev_kelly_kernel(
+        df[prob_col].to_numpy(dtype=np.float64),
+        df[odds_col].to_numpy(dtype=np.float64),
+        float(commission),
+    )
+    df["expected_value"] = ev
+    df["kelly_fraction"] = kelly
 
     return df
 
@@ -46,8 +72,9 @@ def calculate_pnl(df: pd.DataFrame, commission: float = 0.05) -> pd.DataFrame:
     if "pnl" in df.columns and not df["pnl"].isnull().all():
         return df
 
-    df["pnl"] = df.apply(
-        lambda row: (row["odds"] - 1) * (1 - commission) if row["winner"] == 1 else -1,
-        axis=1,
+    df["pnl"] = np.where(
+        df["winner"].to_numpy() == 1,
+        (df["odds"].to_numpy(dtype=float) - 1.0) * (1.0 - commission),
+        -1.0,
     )
     return df
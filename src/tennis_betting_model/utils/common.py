@@ -1,41 +1,69 @@
 # src/tennis_betting_model/utils/common.py
 # mypy: disable-error-code="no-any-return"
 
+import re
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
-from typing import cast
-from .constants import Surface
+from typing import Dict, Tuple, cast
+from .constants import CATEGORICAL_FEATURES, Surface
+
+RankingLookup = Dict[int, Tuple[np.ndarray, np.ndarray]]
+
+_EMPTY_RANKINGS: Tuple[np.ndarray, np.ndarray] = (
+    np.empty(0, dtype=np.int64),
+    np.empty(0, dtype=np.int64),
+)
+
+
+def build_ranking_lookup(df_rankings: pd.DataFrame) -> RankingLookup:
+    """
+    Groups the rankings history once into per-player arrays of
+    (ranking dates as UTC nanoseconds, ranks), sorted by date.
+    """
+    df = df_rankings.sort_values("ranking_date", kind="stable")
+    dates = (
+        pd.to_datetime(df["ranking_date"], utc=True)
+        .to_numpy(dtype="datetime64[ns]")
+        .view(np.int64)
+    )
+    ranks = df["rank"].to_numpy(dtype=np.int64)
+
+    lookup: RankingLookup = {}
+    for player_id, positions in df.groupby("player", sort=False).indices.items():
+        lookup[cast(int, player_id)] = (dates[positions], ranks[positions])
+    return lookup
 
 
 def get_most_recent_ranking(
-    df_rankings: pd.DataFrame,
+    ranking_lookup: RankingLookup,
     player_id: int,
     match_date: pd.Timestamp,
     default_rank: int,
 ) -> int:
     """
-    Finds the most recent ranking for a player prior to a given date.
-    Assumes df_rankings is sorted by ranking_date.
+    Finds the most recent ranking for a player prior to a given date, using a
+    lookup built by build_ranking_lookup.
     """
     if match_date.tzinfo is None:
         match_date = match_date.tz_localize("UTC")
 
-    if not hasattr(get_most_recent_ranking, "player_rankings_map"):
-        get_most_recent_ranking.player_rankings_map = dict(  # type: ignore
-            tuple(df_rankings.groupby("player"))
-        )
+    dates, ranks = ranking_lookup.get(player_id, _EMPTY_RANKINGS)
+    index = int(np.searchsorted(dates, match_date.value, side="right")) - 1
 
-    player_rankings = get_most_recent_ranking.player_rankings_map.get(player_id)  # type: ignore
+    if index >= 0:
+        return int(ranks[index])
 
-    if player_rankings is None or player_rankings.empty:
-        return default_rank
+    return default_rank
 
-    dates = player_rankings["ranking_date"]
-    index = dates.searchsorted(match_date, side="right") - 1
 
-    if index >= 0:
-        return cast(int, player_rankings["rank"].iloc[index])
+_CLAY_KEYWORDS = ["roland garros", "french open", "monte carlo", "madrid", "rome"]
+_GRASS_KEYWORDS = ["wimbledon", "queens club", "halle", "'s-hertogenbosch", "newport"]
 
-    return default_rank
+# Each keyword list is matched in a single scan of the tournament name
+_CLAY_KEYWORDS_PATTERN = re.compile("|".join(map(re.escape, _CLAY_KEYWORDS)))
+_GRASS_KEYWORDS_PATTERN = re.compile("|".join(map(re.escape, _GRASS_KEYWORDS)))
 
 
 def get_surface(tourney_name: str) -> str:
@@ -52,53 +80,55 @@ def get_surface(tourney_name: str) -> str:
     if "(hard)" in name:
         return Surface.HARD.value
 
-    clay_keywords = ["roland garros", "french open", "monte carlo", "madrid", "rome"]
-    grass_keywords = [
-        "wimbledon",
-        "queens club",
-        "halle",
-        "'s-hertogenbosch",
-        "newport",
-    ]
-
-    if any(keyword in name for keyword in grass_keywords):
+    if _GRASS_KEYWORDS_PATTERN.search(name):
         return Surface.GRASS.value
-    if any(keyword in name for keyword in clay_keywords):
+    if _CLAY_KEYWORDS_PATTERN.search(name):
         return Surface.CLAY.value
 
     return Surface.HARD.value
 
 
+_TOURNAMENT_CATEGORY_MAP = {
+    "utr": "UTR / Pro Series",
+    "grand slam": "Grand Slam",
+    "australian open": "Grand Slam",
+    "roland garros": "Grand Slam",
+    "french open": "Grand Slam",
+    "wimbledon": "Grand Slam",
+    "us open": "Grand Slam",
+    "masters": "Masters 1000",
+    "tour finals": "Tour Finals",
+    "next gen finals": "Tour Finals",
+    "atp cup": "Team Event",
+    "davis cup": "Team Event",
+    "laver cup": "Team Event",
+    "olympics": "Olympics",
+    "challenger": "Challenger",
+    "chall": "Challenger",
+    "itf": "ITF / Futures",
+    "futures": "ITF / Futures",
+}
+
+# One lookahead per keyword, tried in map order from the start of the name, so
+# the first keyword in the map wins (not the first one to appear in the name).
+# The matching group number indexes _TOURNAMENT_CATEGORIES.
+_TOURNAMENT_CATEGORY_PATTERN = re.compile(
+    r"\A(?:"
+    + "|".join(f"(?=.*?({re.escape(k)}))" for k in _TOURNAMENT_CATEGORY_MAP)
+    + ")",
+    re.DOTALL,
+)
+_TOURNAMENT_CATEGORIES = ["", *_TOURNAMENT_CATEGORY_MAP.values()]
+
+
+@lru_cache(maxsize=4096)
 def get_tournament_category(tourney_name: str) -> str:
     """
     Categorizes a tournament name into a broader category for better analysis.
     """
-    tourney_name = str(tourney_name).lower()
-
-    category_map = {
-        "utr": "UTR / Pro Series",
-        "grand slam": "Grand Slam",
-        "australian open": "Grand Slam",
-        "roland garros": "Grand Slam",
-        "french open": "Grand Slam",
-        "wimbledon": "Grand Slam",
-        "us open": "Grand Slam",
-        "masters": "Masters 1000",
-        "tour finals": "Tour Finals",
-        "next gen finals": "Tour Finals",
-        "atp cup": "Team Event",
-        "davis cup": "Team Event",
-        "laver cup": "Team Event",
-        "olympics": "Olympics",
-        "challenger": "Challenger",
-        "chall": "Challenger",
-        "itf": "ITF / Futures",
-        "futures": "ITF / Futures",
-    }
-
-    for keyword, category in category_map.items():
-        if keyword in tourney_name:
-            return category
+    match = _TOURNAMENT_CATEGORY_PATTERN.match(str(tourney_name).lower())
+    if match and match.lastindex:
+        return _TOURNAMENT_CATEGORIES[match.lastindex]
 
     return "ATP / WTA Tour"
 
@@ -120,3 +150,35 @@ def patch_winner_column(df: pd.DataFrame) -> pd.DataFrame:
         df["winner"] = 0
     df["winner"] = pd.to_numeric(df["winner"], errors="coerce").fillna(0).astype(int)
     return df
+
+
+def sort_by_date(df: pd.DataFrame, column: str = "tourney_date") -> pd.DataFrame:
+    """
+    Returns df in chronological order with a fresh RangeIndex, keeping same-day
+    rows in their original order. Only the date column is argsorted, and frames
+    that are already in order are not copied row by row.
+    """
+    dates = df[column]
+    if not dates.is_monotonic_increasing:
+        df = df.take(np.argsort(dates.to_numpy(), kind="stable"))
+    return df.reset_index(drop=True)
+
+
+def to_feature_library_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the feature library with the dtypes its Parquet copy is stored in:
+    float32 floats, int64 integers, CATEGORICAL_FEATURES as categories and every
+    other category column as plain strings. Used by both writers of the copy, so
+    the columns a load returns do not depend on which one wrote it.
+    """
+    dtypes: dict = {}
+    for col, dtype in df.dtypes.items():
+        if col in CATEGORICAL_FEATURES:
+            dtypes[col] = "category"
+        elif isinstance(dtype, pd.CategoricalDtype):
+            dtypes[col] = object
+        elif pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            dtypes[col] = np.float32
+        elif pd.api.types.is_integer_dtype(dtype) and dtype != np.int64:
+            dtypes[col] = np.int64
+    return df.astype(dtypes) if dtypes else df
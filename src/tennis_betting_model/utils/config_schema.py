@@ -1,7 +1,7 @@
 # src/tennis_betting_model/utils/config_schema.py
 
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal
 
 
 class DataPaths(BaseModel):
@@ -38,6 +38,11 @@ class TrainingParams(BaseModel):
     max_training_samples: int | None = None
     early_stopping_rounds: int
     validation_size: float
+    n_jobs: int | None = None
+    threads_per_trial: int = 2
+    tuning_strategy: Literal["tpe", "stepwise"] = "tpe"
+    device: Literal["cpu", "gpu"] = "cpu"
+    optuna_storage: str | None = None
 
 
 class LiveTradingParams(BaseModel):
@@ -14,6 +14,10 @@ DEFAULT_MAX_MARGIN = 1.05  # Corresponds to a 5% bookmaker margin
 BOOKMAKER_MARGIN = 1.05  # Represents a 5% margin for odds simulation
 BACKTEST_MAX_ODDS = 50.0
 
+# --- Modeling ---
+# Low-cardinality string features passed to LightGBM as native categoricals
+CATEGORICAL_FEATURES = ["p1_hand", "p2_hand", "surface"]
+
 # --- Simulation Defaults ---
 DEFAULT_INITIAL_BANKROLL = 1000.0
 
@@ -1,4 +1,5 @@
 # FILE: src/tennis_betting_model/utils/data_loader.py
+import numpy as np
 import pandas as pd
 from .logger import log_info, log_error, log_success
 from .schema import validate_data
@@ -8,6 +9,7 @@ import os
 from pathlib import Path
 from functools import lru_cache
 from .config_schema import DataPaths
+from .file_utils import is_cache_fresh
 
 
 class DataLoader:
@@ -125,13 +127,19 @@ class DataLoader:
         """Loads and prepares the backtest results data specifically for the dashboard."""
         try:
             results_path = Path(self.paths.backtest_results)
-            df = pd.read_csv(results_path, dtype={"market_id": str})
+            parquet_path = results_path.with_suffix(".parquet")
+            # The Parquet copy is written after the CSV; an older one is stale.
+            if is_cache_fresh(parquet_path, results_path):
+                df = pd.read_parquet(parquet_path)
+            else:
+                df = pd.read_csv(results_path, dtype={"market_id": str})
             df["tourney_date"] = pd.to_datetime(df["tourney_date"])
 
             if "pnl" not in df.columns:
-                df["pnl"] = df.apply(
-                    lambda row: (row["odds"] - 1) * 0.95 if row["winner"] == 1 else -1,
-                    axis=1,
+                df["pnl"] = np.where(
+                    df["winner"].to_numpy() == 1,
+                    (df["odds"].to_numpy(dtype=float) - 1.0) * 0.95,
+                    -1.0,
                 )
 
             features_path = Path(self.paths.consolidated_features)
@@ -1,8 +1,10 @@
 # src/scripts/utils/file_utils.py
 
 import glob
+import hashlib
+import os
 import pandas as pd
-from typing import List
+from typing import Iterable, List
 
 
 def load_dataframes(glob_pattern: str, add_source_column: bool = False) -> pd.DataFrame:
@@ -32,3 +34,42 @@ def load_dataframes(glob_pattern: str, add_source_column: bool = False) -> pd.Da
         df_list.append(df)
 
     return pd.concat(df_list, ignore_index=True)
+
+
+def get_files_signature(paths: Iterable[str], *extra: object) -> str:
+    """
+    Computes a cheap signature for a set of input files from their path, modification
+    time and size, without reading their contents.
+
+    Args:
+        paths (Iterable[str]): The input file paths to include in the signature.
+        *extra (object): Additional values (e.g., parameters) that should invalidate
+                         the signature when they change.
+
+    Returns:
+        str: A hex digest that changes whenever any input file or extra value changes.
+    """
+    stats = sorted((str(p), os.path.getmtime(p), os.path.getsize(p)) for p in paths)
+    return hashlib.blake2b(str((stats, extra)).encode()).hexdigest()
+
+
+def is_cache_fresh(
+    cache_path: str | os.PathLike, source_path: str | os.PathLike
+) -> bool:
+    """
+    Checks whether a derived copy of a file (e.g., a Parquet cache of a CSV) can be
+    used in place of its source.
+
+    Args:
+        cache_path (str | os.PathLike): The derived file.
+        source_path (str | os.PathLike): The file it was derived from.
+
+    Returns:
+        bool: True if the cache exists and was written no earlier than the source
+              was last modified (or the source no longer exists).
+    """
+    if not os.path.exists(cache_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(cache_path) >= os.path.getmtime(source_path)
@@ -94,3 +94,4 @@ def test_feature_builder_builds_correct_features(mock_builder_data):
     assert features["p2_matches_last_7_days"] == 1
 
     assert features["p1_hand"] == "R"
+    assert features["surface"] == "Hard"
@@ -1,6 +1,7 @@
 import pandas as pd
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 
 from tennis_betting_model.builders.player_mapper import run_create_mapping_file
 from tennis_betting_model.utils.config_schema import DataPaths, MappingParams
@@ -100,3 +101,27 @@ def test_create_mapping_file_uses_historical_data_for_tour(
     fritz_result = results.get("Taylor Fritz")
     assert fritz_result is not None
     assert fritz_result["historical_id"] == 4
+
+
+def test_create_mapping_file_skips_when_inputs_unchanged(
+    mock_historical_driven_player_data,
+):
+    """
+    Tests that a second run with unchanged inputs reuses the existing mapping file
+    instead of re-running the matching passes.
+    """
+    config = mock_historical_driven_player_data
+    data_paths = DataPaths(**config["data_paths"])
+    mapping_params = MappingParams(**config["mapping_params"])
+
+    run_create_mapping_file(data_paths, mapping_params)
+    signature_path = Path(data_paths.player_map + ".sig")
+    first_signature = signature_path.read_text()
+
+    with patch("tennis_betting_model.builders.player_mapper.PlayerMapper") as mapper:
+        run_create_mapping_file(data_paths, mapping_params)
+        mapper.assert_not_called()
+
+    # Changing a parameter invalidates the cached mapping
+    run_create_mapping_file(data_paths, MappingParams(confidence_threshold=90))
+    assert signature_path.read_text() != first_signature
@@ -0,0 +1,54 @@
+# tests/builders/test_vectorized_features.py
+
+import pandas as pd
+import pytest
+from tennis_betting_model.builders.vectorized_features import (
+    build_vectorized_features,
+)
+
+
+@pytest.fixture
+def sample_matches() -> pd.DataFrame:
+    """Three chronological matches between three players across two surfaces."""
+    return pd.DataFrame(
+        {
+            "match_id": ["m1", "m2", "m3"],
+            "tourney_date": pd.to_datetime(
+                ["2023-01-01", "2023-01-02", "2023-01-03"], utc=True
+            ),
+            "surface": ["Hard", "Clay", "Hard"],
+            "winner_historical_id": [1, 1, 2],
+            "loser_historical_id": [2, 3, 1],
+            "sets_played": [3, 2, 3],
+            "p1_id": [1, 1, 1],
+            "p2_id": [2, 3, 2],
+        }
+    )
+
+
+def test_surface_win_perc_uses_only_prior_matches(sample_matches):
+    """
+    Tests that the surface win percentage only counts earlier matches played
+    by the same player on the same surface.
+    """
+    result = build_vectorized_features(sample_matches).set_index("match_id")
+
+    # First appearance on each surface has no history.
+    assert result.loc["m1", "p1_surface_win_perc"] == 0.0
+    assert result.loc["m1", "p2_surface_win_perc"] == 0.0
+    assert result.loc["m2", "p1_surface_win_perc"] == 0.0
+
+    # Player 1 won their only prior Hard match; player 2 lost theirs.
+    assert result.loc["m3", "p1_surface_win_perc"] == pytest.approx(1.0)
+    assert result.loc["m3", "p2_surface_win_perc"] == pytest.approx(0.0)
+
+
+def test_surface_columns_are_returned_as_strings(sample_matches):
+    """
+    Tests that the internal category cast does not leak into the output, where
+    p1_/p2_surface would otherwise become extra categorical model features.
+    """
+    result = build_vectorized_features(sample_matches)
+
+    for col in ["surface", "p1_surface", "p2_surface"]:
+        assert result[col].dtype == object
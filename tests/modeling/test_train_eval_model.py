@@ -6,8 +6,15 @@ from lightgbm import LGBMClassifier
 import numpy as np
 import joblib
 import optuna
+import json
+import os
 
-from tennis_betting_model.modeling.train_eval_model import train_eval_model
+from tennis_betting_model.modeling.train_eval_model import (
+    _study_name,
+    load_feature_data,
+    train_eval_model,
+)
+from tennis_betting_model.utils.common import to_feature_library_dtypes
 
 
 @pytest.fixture
@@ -76,7 +83,143 @@ def test_train_eval_model_logic_is_sound(tmp_path, sample_feature_data):
     model = joblib.load(model_path)
 
     expected_features = set(
-        ["p1_rank", "p2_rank", "rank_diff", "p1_hand_R", "p2_hand_R"]
+        ["p1_rank", "p2_rank", "rank_diff", "p1_hand", "p2_hand", "surface"]
     )
     model_features = set(model.feature_names_in_)
     assert expected_features.issubset(model_features)
+    # Hands are native categoricals rather than one-hot columns
+    assert not {"p1_hand_R", "p2_hand_R"} & model_features
+
+
+def test_train_eval_model_stepwise_strategy(tmp_path, sample_feature_data):
+    """
+    Tests that the stepwise tuning strategy runs every stage and still saves a
+    model built from the best parameters.
+    """
+    model_path = tmp_path / "test_model_stepwise.joblib"
+    training_params = {
+        "hyperparameter_trials": 8,
+        "early_stopping_rounds": 10,
+        "tuning_strategy": "stepwise",
+    }
+
+    train_eval_model(
+        data=sample_feature_data,
+        model_output_path=str(model_path),
+        plot_dir=str(tmp_path),
+        training_params=training_params,
+    )
+
+    model = joblib.load(model_path)
+    assert isinstance(model, LGBMClassifier)
+
+
+def test_final_model_is_refit_without_validation(tmp_path, sample_feature_data):
+    """
+    Tests that the final model takes its tree count from the tuning trials and is
+    refit without an evaluation set or early stopping.
+    """
+    model_path = tmp_path / "test_model_refit.joblib"
+    training_params = {"hyperparameter_trials": 3, "early_stopping_rounds": 10}
+
+    train_eval_model(
+        data=sample_feature_data,
+        model_output_path=str(model_path),
+        plot_dir=str(tmp_path),
+        training_params=training_params,
+    )
+
+    model = joblib.load(model_path)
+    with open(model_path.with_suffix(".json")) as f:
+        metrics = json.load(f)
+    assert metrics["final_n_estimators"] >= 1
+    assert model.n_estimators == metrics["final_n_estimators"]
+    # Only tuned parameters are recorded, so the next run can enqueue them as is
+    if metrics["best_params"]["boosting_type"] != "dart":
+        assert "n_estimators" not in metrics["best_params"]
+    assert model.evals_result_ == {}
+    assert model.best_iteration_ == 0
+
+
+def test_study_name_changes_when_data_is_refreshed(sample_feature_data):
+    """
+    Tests that appending rows starts a new study, so scores from different data
+    versions are never compared.
+    """
+    refreshed = pd.concat(
+        [sample_feature_data, sample_feature_data.tail(1)], ignore_index=True
+    )
+
+    assert _study_name(sample_feature_data) == _study_name(sample_feature_data.copy())
+    assert _study_name(refreshed) != _study_name(sample_feature_data)
+
+
+def test_load_feature_data_rereads_a_newer_csv(tmp_path, sample_feature_data):
+    """
+    Tests that the Parquet cache is ignored and rewritten once the CSV it was
+    made from has changed.
+    """
+    feature_path = tmp_path / "features.csv"
+    sample_feature_data.to_csv(feature_path, index=False)
+    assert len(load_feature_data(feature_path)) == len(sample_feature_data)
+
+    sample_feature_data.head(10).to_csv(feature_path, index=False)
+    parquet_path = feature_path.with_suffix(".parquet")
+    csv_mtime = os.path.getmtime(feature_path)
+    os.utime(parquet_path, (csv_mtime - 10, csv_mtime - 10))
+
+    assert len(load_feature_data(feature_path)) == 10
+    assert os.path.getmtime(parquet_path) >= csv_mtime
+
+
+def test_only_known_categoricals_become_features(tmp_path, sample_feature_data):
+    """
+    Tests that a category column outside CATEGORICAL_FEATURES is dropped like a
+    text column, so the model's categoricals match what live scoring encodes.
+    """
+    sample_feature_data["p1_surface"] = sample_feature_data["surface"].astype(
+        "category"
+    )
+    model_path = tmp_path / "test_model_categoricals.joblib"
+
+    train_eval_model(
+        data=sample_feature_data,
+        model_output_path=str(model_path),
+        plot_dir=str(tmp_path),
+        training_params={"hyperparameter_trials": 2, "early_stopping_rounds": 10},
+    )
+
+    model = joblib.load(model_path)
+    assert "p1_surface" not in model.feature_names_in_
+    assert len(model.booster_.pandas_categorical) == 3
+
+
+def test_csv_and_build_parquet_load_identically(tmp_path, sample_feature_data):
+    """
+    Tests that the feature library loads with the same columns and dtypes whether
+    it comes from the CSV or from the Parquet copy the build step writes.
+    """
+    sample_feature_data["p1_id"] = sample_feature_data["p1_id"].astype("int32")
+    sample_feature_data["p1_surface"] = sample_feature_data["surface"].astype(
+        "category"
+    )
+    sample_feature_data["tourney_date"] = sample_feature_data[
+        "tourney_date"
+    ].dt.tz_localize("UTC")
+    csv_path = tmp_path / "csv" / "features.csv"
+    build_path = tmp_path / "build" / "features.csv"
+    csv_path.parent.mkdir()
+    build_path.parent.mkdir()
+    sample_feature_data.to_csv(csv_path, index=False)
+    to_feature_library_dtypes(sample_feature_data).to_parquet(
+        build_path.with_suffix(".parquet"), index=False
+    )
+
+    from_csv = load_feature_data(csv_path)
+    from_build = load_feature_data(build_path)
+    # A later load reads the Parquet copy cached from the CSV
+    from_cache = load_feature_data(csv_path)
+
+    pd.testing.assert_series_equal(from_csv.dtypes, from_build.dtypes)
+    pd.testing.assert_series_equal(from_cache.dtypes, from_build.dtypes)
+    assert "p1_surface" not in from_build.columns
@@ -1,6 +1,7 @@
 # tests/pipeline/test_flumine_strategy.py
 import unittest
 import datetime
+import sqlite3
 from unittest import mock
 from pathlib import Path
 
@@ -61,6 +62,7 @@ class FlumineStrategyTest(unittest.TestCase):
 
     def tearDown(self):
         """Clean up the test database file after each test."""
+        self.strategy.finish(None)
         if self.db_path.exists():
             self.db_path.unlink()
 
@@ -77,6 +79,34 @@ class FlumineStrategyTest(unittest.TestCase):
         self.assertEqual(self.strategy.processed_selections, set())
         self.assertFalse(self.strategy.dry_run)
 
+    def test_db_uses_wal_journal(self):
+        """Test that the processed selections DB is opened in WAL mode."""
+        journal_mode = self.strategy._db.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(journal_mode, "wal")
+
+    def test_checkpoint_truncates_wal(self):
+        """Test that a checkpoint copies flushed writes back and empties the WAL."""
+        self.strategy._save_processed_selection(("1.234", 567))
+        self.strategy.flush_processed_selections()
+        wal_path = Path(f"{self.db_path}-wal")
+        self.assertGreater(wal_path.stat().st_size, 0)
+
+        self.strategy.checkpoint_processed_selections()
+        self.assertEqual(wal_path.stat().st_size, 0)
+
+    def test_save_reuses_connection(self):
+        """Test that recording a selection does not open a new DB connection."""
+        with mock.patch(
+            "src.tennis_betting_model.pipeline.flumine_strategy.sqlite3.connect"
+        ) as mock_connect:
+            self.strategy._save_processed_selection(("1.234", 567))
+            self.strategy.flush_processed_selections()
+        mock_connect.assert_not_called()
+        count = self.strategy._db.execute(
+            "SELECT COUNT(*) FROM processed_selections"
+        ).fetchone()[0]
+        self.assertEqual(count, 1)
+
     def test_check_market_book_valid(self):
         """Test check_market_book returns True for a valid market."""
         mock_market = self._create_mock_market()
@@ -89,6 +119,18 @@ class FlumineStrategyTest(unittest.TestCase):
         mock_market_book.market_definition.market_time = start_time
         self.assertTrue(self.strategy.check_market_book(mock_market, mock_market_book))
 
+    def test_check_market_book_naive_start_time(self):
+        """Test that a naive market start time is interpreted as UTC."""
+        mock_market = self._create_mock_market()
+        mock_market_book = mock.Mock()
+        mock_market_book.status = "OPEN"
+        mock_market_book.inplay = False
+        start_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            minutes=30
+        )
+        mock_market_book.market_definition.market_time = start_time.replace(tzinfo=None)
+        self.assertTrue(self.strategy.check_market_book(mock_market, mock_market_book))
+
     def test_check_market_book_invalid_status(self):
         """Test check_market_book returns False for a closed market."""
         mock_market = self._create_mock_market()
@@ -133,6 +175,7 @@ class FlumineStrategyTest(unittest.TestCase):
         """Test the logic for placing an order from an identified value bet."""
         self.mock_risk_manager_instance.can_place_bet.return_value = True
         mock_market = mock.Mock()
+        mock_market.blotter.strategy_orders.return_value = []
         mock_market.market_id = "1.234"
         mock_market.blotter.selection_exposure.return_value = 0.0
 
@@ -141,7 +184,7 @@ class FlumineStrategyTest(unittest.TestCase):
                 "selection_id": 567,
                 "player_name": "Test Player",
                 "odds": 2.5,
-                "ev": "20%",
+                "ev": 0.2,
                 "kelly_fraction": 0.1,
             }
         ]
@@ -159,13 +202,18 @@ class FlumineStrategyTest(unittest.TestCase):
             self.assertEqual(call_args["order_type"].size, round(stake, 2))
 
             mock_market.place_order.assert_called_once()
-            self.assertIn("1.234-567", self.strategy.processed_selections)
+            self.assertIn(("1.234", 567), self.strategy.processed_selections)
+            # A real order is written through without waiting for a flush
+            self.assertEqual(
+                self.strategy._load_processed_selections(), {("1.234", 567)}
+            )
 
     def test_place_orders_dry_run(self):
         """Test that no order is placed in dry-run mode."""
         self.strategy.dry_run = True
         self.mock_risk_manager_instance.can_place_bet.return_value = True
         mock_market = mock.Mock()
+        mock_market.blotter.strategy_orders.return_value = []
         mock_market.market_id = "1.234"
         mock_market.blotter.selection_exposure.return_value = 0.0
         value_bets = [
@@ -173,34 +221,92 @@ class FlumineStrategyTest(unittest.TestCase):
                 "selection_id": 567,
                 "player_name": "Test Player",
                 "odds": 2.5,
-                "ev": "20%",
+                "ev": 0.2,
                 "kelly_fraction": 0.1,
             }
         ]
         self.strategy.place_orders_from_bets(mock_market, value_bets)
         mock_market.place_order.assert_not_called()
-        self.assertIn("1.234-567", self.strategy.processed_selections)
+        self.assertIn(("1.234", 567), self.strategy.processed_selections)
 
     def test_place_orders_already_processed(self):
         """Test that a bet on an already processed selection is not placed again."""
         mock_market = mock.Mock()
+        mock_market.blotter.strategy_orders.return_value = []
         mock_market.market_id = "1.234"
-        selection_key = "1.234-567"
+        selection_key = ("1.234", 567)
         self.strategy.processed_selections.add(selection_key)
         value_bets = [{"selection_id": 567}]
         self.strategy.place_orders_from_bets(mock_market, value_bets)
         mock_market.place_order.assert_not_called()
 
+    def test_processed_selections_reload_from_db(self):
+        """Test that persisted selections are restored as lookup keys on startup."""
+        self.strategy._save_processed_selection(("1.234", 567))
+        self.strategy.flush_processed_selections()
+        self.assertEqual(self.strategy._load_processed_selections(), {("1.234", 567)})
+
+    def test_legacy_string_keys_are_migrated(self):
+        """Test that a DB with "<market_id>-<selection_id>" keys is migrated."""
+        self.strategy.finish(None)
+        self.db_path.unlink()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE processed_selections (key TEXT PRIMARY KEY)")
+            conn.execute("INSERT INTO processed_selections VALUES ('1.234-567')")
+        conn.close()
+
+        self.strategy = TennisValueStrategy(
+            market_filter=self.mock_market_filter,
+            market_processor=self.mock_market_processor,
+            betting_config=self.mock_betting_config,
+            live_trading_config=self.mock_live_trading_config,
+            dry_run=False,
+            processed_bets_log_path=str(self.db_path),
+        )
+        self.assertEqual(self.strategy.processed_selections, {("1.234", 567)})
+
+    def test_save_defers_db_write_until_flush(self):
+        """Test that selections are only written to the DB when flushed."""
+        self.strategy._save_processed_selection(("1.234", 567))
+        self.assertIn(("1.234", 567), self.strategy.processed_selections)
+        self.assertEqual(self.strategy._load_processed_selections(), set())
+
+        self.strategy.flush_processed_selections()
+        self.assertEqual(self.strategy._load_processed_selections(), {("1.234", 567)})
+
+    def test_place_orders_skips_selection_with_exposure(self):
+        """Test that a selection with existing exposure is not bet again."""
+        self.mock_risk_manager_instance.can_place_bet.return_value = True
+        mock_market = mock.Mock()
+        mock_market.market_id = "1.234"
+        mock_market.blotter.strategy_orders.return_value = [mock.Mock(selection_id=567)]
+        mock_market.blotter.selection_exposure.return_value = 5.0
+        value_bets = [
+            {
+                "selection_id": 567,
+                "player_name": "Test Player",
+                "odds": 2.5,
+                "ev": 0.2,
+                "kelly_fraction": 0.1,
+            }
+        ]
+        self.strategy.place_orders_from_bets(mock_market, value_bets)
+        mock_market.blotter.selection_exposure.assert_called_once_with(
+            self.strategy, ("1.234", 567, 0)
+        )
+        mock_market.place_order.assert_not_called()
+
     def test_place_orders_risk_manager_blocks(self):
         """Test that the risk manager can block a bet."""
         self.mock_risk_manager_instance.can_place_bet.return_value = False
         mock_market = mock.Mock()
+        mock_market.blotter.strategy_orders.return_value = []
         value_bets = [
             {
                 "selection_id": 567,
                 "player_name": "Test Player",
                 "odds": 2.5,
-                "ev": "20%",
+                "ev": 0.2,
                 "kelly_fraction": 0.1,
             }
         ]
@@ -3,6 +3,7 @@
 import pandas as pd
 import pytest
 from tennis_betting_model.pipeline.simulate_bankroll_growth import (
+    calculate_max_drawdown,
     simulate_bankroll_growth,
 )
 
@@ -71,3 +72,46 @@ def test_simulation_kelly_strategy(sample_bets, simulation_params):
     assert result_df["profit"].tolist() == pytest.approx(expected_profits)
     assert result_df["bankroll"].tolist() == pytest.approx(expected_bankroll)
     assert result_df.iloc[-1]["bankroll"] == pytest.approx(113.1975)
+
+
+def test_simulation_percent_strategy_respects_stake_cap(sample_bets, simulation_params):
+    """Tests the 'percent' staking strategy with the max stake cap applied."""
+    initial_bankroll = 100.0
+
+    result_df = simulate_bankroll_growth(
+        sample_bets,
+        simulation_params,
+        initial_bankroll,
+        strategy="percent",
+        stake_unit=10.0,  # 10% of bankroll, capped at 5%
+        max_stake_cap=0.05,
+    )
+
+    # Bet 1 (Win): Stake=100*0.05=5, Profit=5*1.5=7.5, Bankroll=107.5
+    # Bet 2 (Loss): Stake=107.5*0.05=5.375, Bankroll=102.125
+    # Bet 3 (Win): Stake=102.125*0.05=5.10625, Profit=10.2125, Bankroll=112.3375
+    expected_stakes = [5.0, 5.375, 5.10625]
+    expected_bankroll = [107.5, 102.125, 112.3375]
+
+    assert result_df["stake"].tolist() == pytest.approx(expected_stakes)
+    assert result_df["bankroll"].tolist() == pytest.approx(expected_bankroll)
+
+
+def test_calculate_max_drawdown():
+    """Tests the peak bankroll and the largest fall from a running peak."""
+    bankroll = pd.Series([100.0, 120.0, 90.0, 130.0, 65.0])
+    peak_bankroll, max_drawdown = calculate_max_drawdown(bankroll)
+    assert peak_bankroll == 130.0
+    assert max_drawdown == pytest.approx(-0.5)
+
+
+def test_simulation_orders_unsorted_bets_by_date(sample_bets, simulation_params):
+    """Tests that bets supplied out of order are simulated chronologically."""
+    shuffled = sample_bets.iloc[[2, 0, 1]]
+
+    result_df = simulate_bankroll_growth(
+        shuffled, simulation_params, 100.0, strategy="flat", stake_unit=10.0
+    )
+
+    assert result_df["odds"].tolist() == [2.5, 1.8, 3.0]
+    assert result_df["bankroll"].tolist() == pytest.approx([115.0, 105.0, 125.0])
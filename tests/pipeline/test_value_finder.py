@@ -1,9 +1,21 @@
 # tests/pipeline/test_value_finder.py
+import lightgbm as lgb
+import numpy as np
 import pandas as pd
 import pytest
 from unittest.mock import MagicMock
 
+import joblib
+
+from tennis_betting_model.builders.vectorized_features import (
+    build_vectorized_features,
+)
+from tennis_betting_model.modeling.train_eval_model import (
+    load_feature_data,
+    train_eval_model,
+)
 from tennis_betting_model.pipeline.value_finder import MarketProcessor
+from tennis_betting_model.utils.common import to_feature_library_dtypes
 from tennis_betting_model.builders.feature_builder import FeatureBuilder
 from tennis_betting_model.utils.config_schema import Betting
 
@@ -17,8 +29,9 @@ def mock_dependencies():
         "p1_rank",
         "p2_rank",
         "rank_diff",
-        "p1_hand_R",
-        "p2_hand_R",
+        "p1_hand",
+        "p2_hand",
+        "surface",
     ]
 
     mock_feature_builder = MagicMock(spec=FeatureBuilder)
@@ -26,8 +39,9 @@ def mock_dependencies():
         "p1_rank": 10,
         "p2_rank": 20,
         "rank_diff": -10,
-        "p1_hand_R": 1,
-        "p2_hand_R": 0,
+        "p1_hand": "R",
+        "p2_hand": "L",
+        "surface": "Hard",
     }
 
     # Use the Pydantic model for the betting config
@@ -86,10 +100,14 @@ def test_market_processor_identifies_value(mock_dependencies, mock_market_data):
     bet = result[0]
     assert bet["player_name"] == "Player A"
     assert bet["odds"] == 2.0
-    assert bet["model_prob"] == "60.00%"
-    assert bet["ev"] == "+20.00%"
+    assert bet["model_prob"] == pytest.approx(0.6)
+    assert bet["ev"] == pytest.approx(0.2)
     assert bet["selection_id"] == 101
 
+    # Categorical features reach the model as pandas categoricals, not dummies
+    features_df = model.predict_proba.call_args.args[0]
+    assert (features_df[["p1_hand", "p2_hand", "surface"]].dtypes == "category").all()
+
 
 def test_market_processor_ignores_no_value(mock_dependencies, mock_market_data):
     """
@@ -106,3 +124,218 @@ def test_market_processor_ignores_no_value(mock_dependencies, mock_market_data):
     result = processor.process_market(market_cat, market_book)
 
     assert len(result) == 0
+
+
+def test_market_processor_scores_markets_in_one_batch(
+    mock_dependencies, mock_market_data
+):
+    """
+    Tests that several markets are scored with a single model call and that
+    each market's probabilities are applied to its own runners.
+    """
+    model, feature_builder, config = mock_dependencies
+    market_cat, market_book = mock_market_data
+
+    second_cat = MagicMock()
+    second_cat.market_id = "1.456"
+    second_cat.market_name = "ATP Challenger Clay"
+    second_cat.market_start_time = market_cat.market_start_time
+    second_cat.runners = [
+        MagicMock(runner_name="Player C", selection_id=201),
+        MagicMock(runner_name="Player D", selection_id=202),
+    ]
+    second_book = MagicMock()
+    second_book.runners = [
+        MagicMock(selection_id=201, ex=MagicMock(available_to_back=[{"price": 1.5}])),
+        MagicMock(selection_id=202, ex=MagicMock(available_to_back=[{"price": 3.0}])),
+    ]
+
+    # P1 is the value side in the first market, P2 in the second
+    model.predict_proba.return_value = [[0.4, 0.6], [0.6, 0.4]]
+
+    processor = MarketProcessor(model, feature_builder, config)
+    result = processor.process_markets(
+        [(market_cat, market_book), (second_cat, second_book)]
+    )
+
+    model.predict_proba.assert_called_once()
+    assert len(model.predict_proba.call_args.args[0]) == 2
+    assert [bet["player_name"] for bet in result] == ["Player A", "Player D"]
+    assert [bet["market_id"] for bet in result] == ["1.123", "1.456"]
+
+
+def test_market_processor_skips_runner_without_prices(
+    mock_dependencies, mock_market_data
+):
+    """
+    Tests that a runner with nothing available to back never produces a bet.
+    """
+    model, feature_builder, config = mock_dependencies
+    market_cat, market_book = mock_market_data
+    market_book.runners[0].ex.available_to_back = []
+
+    processor = MarketProcessor(model, feature_builder, config)
+    result = processor.process_market(market_cat, market_book)
+
+    assert result == []
+
+
+@pytest.mark.parametrize("p1_hand", ["L", "U"])
+def test_market_processor_lightgbm_booster_matches_predict_proba(
+    mock_dependencies, mock_market_data, p1_hand
+):
+    """
+    Tests that scoring a fitted LGBMClassifier through its booster, including a
+    category it never saw in training, gives the same probability as the
+    sklearn predict_proba path on a DataFrame.
+    """
+    _, feature_builder, config = mock_dependencies
+    market_cat, market_book = mock_market_data
+    feature_builder.build_features.return_value["p1_hand"] = p1_hand
+
+    rng = np.random.default_rng(0)
+    n = 200
+    X = pd.DataFrame(
+        {
+            "p1_rank": rng.integers(1, 100, n),
+            "p2_rank": rng.integers(1, 100, n),
+            "p1_hand": pd.Categorical(rng.choice(["R", "L"], n)),
+            "surface": pd.Categorical(rng.choice(["Hard", "Clay", "Grass"], n)),
+        }
+    )
+    X["rank_diff"] = X["p1_rank"] - X["p2_rank"]
+    y = (X["rank_diff"] < 0).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=10, verbose=-1).fit(X, y)
+    config.ev_threshold = -1.0  # Report every priced runner
+
+    processor = MarketProcessor(model, feature_builder, config)
+    result = processor.process_market(market_cat, market_book)
+
+    features = feature_builder.build_features.return_value
+    expected_df = pd.DataFrame([features])[list(model.feature_names_in_)].astype(
+        {"p1_hand": "category", "surface": "category"}
+    )
+    expected = model.predict_proba(expected_df)[0, 1]
+    assert result[0]["model_prob"] == pytest.approx(expected)
+
+
+def test_market_processor_matches_runners_out_of_order(
+    mock_dependencies, mock_market_data
+):
+    """
+    Tests that runners are matched by selection id when the book lists them in
+    a different order from the catalogue.
+    """
+    model, feature_builder, config = mock_dependencies
+    market_cat, market_book = mock_market_data
+    market_book.runners.reverse()
+
+    processor = MarketProcessor(model, feature_builder, config)
+    result = processor.process_market(market_cat, market_book)
+
+    assert len(result) == 1
+    assert result[0]["player_name"] == "Player A"
+    assert result[0]["odds"] == 2.0
+
+
+def test_market_processor_skips_market_that_cannot_clear_threshold(
+    mock_dependencies, mock_market_data
+):
+    """
+    Tests that a market where no runner's odds exceed 1 + ev_threshold is
+    dropped before features are built or the model is called.
+    """
+    model, feature_builder, config = mock_dependencies
+    market_cat, market_book = mock_market_data
+    market_book.runners[0].ex.available_to_back = [{"price": 1.05, "size": 100}]
+    market_book.runners[1].ex.available_to_back = [{"price": 1.1, "size": 100}]
+
+    processor = MarketProcessor(model, feature_builder, config)
+    result = processor.process_market(market_cat, market_book)
+
+    assert result == []
+    feature_builder.build_features.assert_not_called()
+    model.predict_proba.assert_not_called()
+
+
+def test_model_trained_on_build_output_scores_live_markets(
+    tmp_path, mock_dependencies, mock_market_data
+):
+    """
+    Tests the full path from the feature build's Parquet output through training
+    to live scoring: the trained model's categoricals must be exactly the ones
+    the MarketProcessor encodes, or every market would be skipped.
+    """
+    _, feature_builder, config = mock_dependencies
+    market_cat, market_book = mock_market_data
+
+    rng = np.random.default_rng(0)
+    n = 120
+    winners = rng.integers(1, 7, n)
+    losers = (winners + rng.integers(1, 6, n) - 1) % 6 + 1
+    p1_is_winner = rng.random(n) < 0.5
+    matches = pd.DataFrame(
+        {
+            "match_id": [f"m{i}" for i in range(n)],
+            "tourney_date": pd.date_range("2023-01-01", periods=n, freq="D", tz="UTC"),
+            "surface": rng.choice(["Hard", "Clay"], n),
+            "winner_historical_id": winners,
+            "loser_historical_id": losers,
+            "sets_played": rng.integers(2, 4, n),
+            "p1_id": np.where(p1_is_winner, winners, losers),
+            "p2_id": np.where(p1_is_winner, losers, winners),
+        }
+    )
+    features = build_vectorized_features(matches)
+    features["winner"] = (features["p1_id"] == features["winner_historical_id"]).astype(
+        int
+    )
+    features["p1_hand"] = rng.choice(["R", "L"], len(features))
+    features["p2_hand"] = rng.choice(["R", "L"], len(features))
+    features["p1_rank"] = rng.integers(1, 100, len(features))
+    features["p2_rank"] = rng.integers(1, 100, len(features))
+    features["rank_diff"] = features["p1_rank"] - features["p2_rank"]
+    # Written the way build_player_features writes its Parquet copy
+    feature_path = tmp_path / "features.csv"
+    to_feature_library_dtypes(features).to_parquet(
+        feature_path.with_suffix(".parquet"), index=False
+    )
+
+    model_path = tmp_path / "model.joblib"
+    train_eval_model(
+        data=load_feature_data(feature_path),
+        model_output_path=str(model_path),
+        plot_dir=str(tmp_path),
+        training_params={"hyperparameter_trials": 2, "early_stopping_rounds": 10},
+    )
+    model = joblib.load(model_path)
+    config.ev_threshold = -1.0  # Report every priced runner
+
+    processor = MarketProcessor(model, feature_builder, config)
+    result = processor.process_market(market_cat, market_book)
+
+    assert len(result) == 2
+
+
+def test_market_processor_rejects_model_with_unexpected_categoricals(
+    mock_dependencies,
+):
+    """
+    Tests that a model trained on a categorical column outside
+    CATEGORICAL_FEATURES fails at startup instead of skipping every market.
+    """
+    _, feature_builder, config = mock_dependencies
+    rng = np.random.default_rng(0)
+    n = 100
+    X = pd.DataFrame(
+        {
+            "p1_rank": rng.integers(1, 100, n),
+            "p1_hand": pd.Categorical(rng.choice(["R", "L"], n)),
+            "p1_surface": pd.Categorical(rng.choice(["Hard", "Clay"], n)),
+        }
+    )
+    y = (X["p1_rank"] < 50).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=5, verbose=-1).fit(X, y)
+
+    with pytest.raises(ValueError, match="categorical"):
+        MarketProcessor(model, feature_builder, config)
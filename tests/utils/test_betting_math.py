@@ -1,7 +1,8 @@
+import numpy as np
 import pandas as pd
 import pytest
 
-from tennis_betting_model.utils.betting_math import add_ev_and_kelly
+from tennis_betting_model.utils.betting_math import add_ev_and_kelly, calculate_pnl
 
 
 def test_add_ev_and_kelly():
@@ -23,3 +24,31 @@ def test_add_ev_and_kelly():
     # Row 3: EV = (0.8 * 0.2) - 0.2 = -0.04. Kelly is clipped to 0.
     assert pytest.approx(df_processed.loc[2, "expected_value"]) == -0.04
     assert pytest.approx(df_processed.loc[2, "kelly_fraction"]) == 0.0
+
+
+def test_calculate_pnl_applies_commission_to_winners_only():
+    df = pd.DataFrame({"odds": [2.0, 3.5, 1.5], "winner": [1, 0, 1]})
+    result = calculate_pnl(df, commission=0.05)
+
+    assert result["pnl"].tolist() == pytest.approx([0.95, -1.0, 0.475])
+
+
+def test_calculate_pnl_keeps_existing_pnl():
+    df = pd.DataFrame({"odds": [2.0], "winner": [1], "pnl": [0.5]})
+
+    assert calculate_pnl(df)["pnl"].tolist() == [0.5]
+
+
+def test_add_ev_and_kelly_with_commission_and_unbettable_odds():
+    df = pd.DataFrame(
+        {"predicted_prob": [0.5, 0.9, np.nan], "odds": [3.0, 1.0, np.nan]}
+    )
+    result = add_ev_and_kelly(df, commission=0.05, inplace=False)
+
+    # Kelly = 0.5 - 0.5 / (2 * 0.95)
+    assert result.loc[0, "kelly_fraction"] == pytest.approx(0.5 - 0.5 / 1.9)
+    assert result.loc[0, "expected_value"] == pytest.approx(0.5)
+    # Odds of 1.0 and missing odds never produce a stake.
+    assert result.loc[1, "kelly_fraction"] == 0.0
+    assert result.loc[2, "kelly_fraction"] == 0.0
+    assert np.isnan(result.loc[2, "expected_value"])
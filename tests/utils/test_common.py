@@ -4,10 +4,13 @@ import pytest
 import pandas as pd
 import numpy as np
 from tennis_betting_model.utils.common import (
+    build_ranking_lookup,
+    get_most_recent_ranking,
     get_surface,
     get_tournament_category,
     normalize_df_column_names,
     patch_winner_column,
+    sort_by_date,
 )
 
 
@@ -39,6 +42,8 @@ def test_get_surface(tourney_name, expected_surface):
         ("ATP Challenger Seville", "Challenger"),
         ("ITF M15 Sharm El Sheikh", "ITF / Futures"),
         ("ATP 250 Doha", "ATP / WTA Tour"),
+        # The first keyword in the category map wins, not the first in the name
+        ("Challenger UTR Pro Series", "UTR / Pro Series"),
     ],
 )
 def test_get_tournament_category(tourney_name, expected_category):
@@ -80,3 +85,42 @@ def test_patch_winner_column_handles_mixed_types_and_nans():
     patched_df = patch_winner_column(df)
     expected = pd.Series([1, 0, 0, 1], dtype=int)
     assert patched_df["winner"].equals(expected)
+
+
+def test_sort_by_date_is_stable_and_reindexes():
+    """Tests that rows are ordered by date, ties keep their order, and the index is reset."""
+    df = pd.DataFrame(
+        {
+            "tourney_date": pd.to_datetime(
+                ["2023-01-02", "2023-01-01", "2023-01-02", "2023-01-01"]
+            ),
+            "match_id": ["c", "a", "d", "b"],
+        },
+        index=[10, 11, 12, 13],
+    )
+    result = sort_by_date(df)
+    assert result["match_id"].tolist() == ["a", "b", "c", "d"]
+    assert result.index.tolist() == [0, 1, 2, 3]
+
+
+def test_get_most_recent_ranking_uses_latest_prior_entry():
+    """Tests the ranking in force at the match date is returned, per player."""
+    df_rankings = pd.DataFrame(
+        {
+            "ranking_date": pd.to_datetime(
+                ["2023-01-09", "2023-01-02", "2023-01-02"], utc=True
+            ),
+            "player": [1, 1, 2],
+            "rank": [5, 8, 40],
+        }
+    )
+    lookup = build_ranking_lookup(df_rankings)
+
+    assert get_most_recent_ranking(lookup, 1, pd.Timestamp("2023-01-01"), 500) == 500
+    assert get_most_recent_ranking(lookup, 1, pd.Timestamp("2023-01-05"), 500) == 8
+    assert (
+        get_most_recent_ranking(lookup, 1, pd.Timestamp("2023-01-09", tz="UTC"), 500)
+        == 5
+    )
+    assert get_most_recent_ranking(lookup, 2, pd.Timestamp("2023-02-01"), 500) == 40
+    assert get_most_recent_ranking(lookup, 3, pd.Timestamp("2023-02-01"), 500) == 500